@@ -1,318 +1,879 @@
-from typing import Dict, Any
-import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from itertools import islice
+from operator import itemgetter
+from typing import Dict, Any, Callable, Iterator, List, Optional, Set, Tuple, Union
 
 from src.api.etherscan_v2 import EtherscanV2Client
+from src.api.expansion_policy import ExpansionPolicy
+from src.api.frontier import FrontierRanker, INCOMING, OUTGOING
+from src.api.tx_batch import build_edge_batch
+from src.api.traversal import BudgetExhausted, TraceBudget, TraversalEngine, DEFAULT_MAX_WORKERS
+from src.utils.method_registry import get_method
+from src.utils.single_flight import SingleFlight
+from src.utils.web3_pool import Web3Pool, get_web3_pool
 
-from src.enums.tx_types_enum import TxTypesEnum as TxTypes
-from src.enums.methods_enum import MethodsEnum as Methods
 from src.enums.bridges_enum import BridgesEnum as Bridges
+from src.enums.tx_types_enum import TxTypesEnum as TxTypes
+from src.enums.hub_mode_enum import HubModeEnum as HubMode
+from src.enums.rank_by_enum import RankByEnum as RankBy
 
 from src.bridges import debridge, usdt0
+from src.bridges.decode_cache import BridgeDecodeCache, get_decode_cache
 
-from src.constants.bridge_methods import METHODS as BRIDGE_METHODS
-from src.constants.swap_methods import METHODS as SWAP_METHODS
 from src.constants.rpc_urls import URLS as RPC_URLS
 from src.constants.token_addresses import USDT_ADDRESS
 from src.types.graph import Graph
+from src.types.graph_store import make_node_id
 from src.types.scoring_graph import ScoringGraph
-from src.utils.token.services import get_token_price
-
-from web3 import Web3
+from src.utils.token.price_history import PriceHistory, get_price_history
 
-NATIVE_TOKEN_DECIMALS = 18
 DEFAULT_START_BLOCK = 0
 DEFAULT_END_BLOCK = 99999999
+DEFAULT_MAX_ROWS = 1000
+DEFAULT_SCORING_MAX_ROWS = 100
+FUND_FLOW_ACTIONS = ('txlist', 'tokentx', 'txlistinternal')
+SCORING_ACTIONS = ('txlist', 'tokentx')
+SUPPORTED_CHAIN_IDS = tuple(int(chain_id) for chain_id in RPC_URLS)
+DEFAULT_MAX_PATHS = 10
+
+BRIDGE_DECODERS = {
+    'debridge': lambda tx_hash, chain_id, tx: debridge.decode_bridge_transaction(tx_hash=tx_hash),
+    'usdt0': lambda tx_hash, chain_id, tx: usdt0.decode_bridge_transaction(tx_hash=tx_hash, chain_id=chain_id, tx=tx)
+}
+
+HopCallback = Callable[[Union[Graph, ScoringGraph], int, List[str]], None]
+
+def _iter_paths(links: Dict[str, Set[str]], node: str, end: str) -> Iterator[List[str]]:
+    if node == end:
+        yield [node]
+        return
+
+    for next_node in sorted(links[node]):
+        for rest in _iter_paths(links, next_node, end):
+            yield [node] + rest
 
 class Analyzer:
-    def __init__(self, api_key: str):
+    def __init__(
+        self,
+        api_key: str,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        expansion_policy: Optional[ExpansionPolicy] = None,
+        price_history: Optional[PriceHistory] = None,
+        bridge_cache: Optional[BridgeDecodeCache] = None,
+        web3_pool: Optional[Web3Pool] = None
+    ):
         self.scanner = EtherscanV2Client(api_key=api_key)
+        self.traversal = TraversalEngine(
+            fetchers={
+                'txlist': self._fetch_normal_txs,
+                'tokentx': self._fetch_erc20_transfers,
+                'txlistinternal': self._fetch_internal_txs
+            },
+            max_workers=max_workers
+        )
+        self.in_flight = SingleFlight()
+        self.expansion_policy = expansion_policy or ExpansionPolicy()
+        self.price_history = price_history or get_price_history()
+        self.bridge_cache = bridge_cache or get_decode_cache()
+        self.web3_pool = web3_pool or get_web3_pool()
 
-    def get_fund_flow_by_address(self, chain_id: int, address: str) -> Dict[str, Any]:
+    def get_fund_flow_by_address(
+        self,
+        chain_id: int,
+        address: str,
+        max_rows: int = DEFAULT_MAX_ROWS,
+        start_block: int = DEFAULT_START_BLOCK,
+        end_block: int = DEFAULT_END_BLOCK,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        deadline_ms: Optional[int] = None,
+        max_calls: Optional[int] = None
+    ) -> Dict[str, Any]:
+        return self.build_fund_flow_graph(
+            chain_id=chain_id,
+            address=address,
+            max_rows=max_rows,
+            start_block=start_block,
+            end_block=end_block,
+            start_time=start_time,
+            end_time=end_time,
+            deadline_ms=deadline_ms,
+            max_calls=max_calls
+        ).to_dict()
+
+    def build_fund_flow_graph(
+        self,
+        chain_id: int,
+        address: str,
+        max_rows: int = DEFAULT_MAX_ROWS,
+        start_block: int = DEFAULT_START_BLOCK,
+        end_block: int = DEFAULT_END_BLOCK,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        deadline_ms: Optional[int] = None,
+        max_calls: Optional[int] = None,
+        on_hop: Optional[HopCallback] = None
+    ) -> Graph:
+        window = {
+            'max_rows': max_rows,
+            'start_block': start_block,
+            'end_block': end_block,
+            'start_time': start_time,
+            'end_time': end_time
+        }
+        key = ('fund-flow', chain_id, address.lower(), *window.values(), deadline_ms, max_calls)
+
+        def build() -> Graph:
+            return self._build_fund_flow_graph(
+                chain_id=chain_id,
+                address=address,
+                budget=self._make_budget(deadline_ms=deadline_ms, max_calls=max_calls),
+                on_hop=on_hop,
+                **window
+            )
+
+        # A coalesced follower would never see the leader's hop callbacks
+        return build() if on_hop else self.in_flight.do(key, build)
+
+    def _build_fund_flow_graph(
+        self,
+        chain_id: int,
+        address: str,
+        budget: Optional[TraceBudget],
+        on_hop: Optional[HopCallback],
+        **window
+    ) -> Graph:
         graph = Graph()
 
-        fetchers = [
-            self._fetch_normal_txs,
-            self._fetch_erc20_transfers
-        ]
+        completed, _ = self.traversal.fetch_frontier(
+            chain_id=chain_id,
+            addresses=[address],
+            on_rows=lambda _, action, txs: self._add_txs(graph=graph, chain_id=chain_id, txs=txs, action=action),
+            actions=FUND_FLOW_ACTIONS,
+            strict=True,
+            budget=budget,
+            **window
+        )
 
-        for fetcher in fetchers:
-            txs = fetcher(chain_id=chain_id, address=address)
+        if on_hop:
+            on_hop(graph, 0, [address.lower()])
 
-            for tx in txs:
-                self._add_nodes_from_tx(graph=graph, chain_id=chain_id, tx=tx)
-                self._add_edge_from_tx(graph=graph, chain_id=chain_id, tx=tx)
+        if budget is not None:
+            explored = len(completed[address]) == len(FUND_FLOW_ACTIONS)
+            self._set_trace_metadata(
+                graph=graph,
+                budget=budget,
+                hops_completed=1 if explored else 0,
+                unexplored=[] if explored else [address.lower()]
+            )
 
-        return graph.to_dict()
+        return graph
 
-    def analyze_bridge_transaction(self, chain_id: int, tx_hash: str) -> Dict[str, Any]:
-        url = RPC_URLS[str(chain_id)]
-        w3 = Web3(Web3.HTTPProvider(url))
+    def get_multichain_fund_flow_by_address(
+        self,
+        address: str,
+        chain_ids: Optional[List[int]] = None,
+        max_rows: int = DEFAULT_MAX_ROWS,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        deadline_ms: Optional[int] = None,
+        max_calls: Optional[int] = None
+    ) -> Dict[str, Any]:
+        return self.build_multichain_fund_flow_graph(
+            address=address,
+            chain_ids=chain_ids,
+            max_rows=max_rows,
+            start_time=start_time,
+            end_time=end_time,
+            deadline_ms=deadline_ms,
+            max_calls=max_calls
+        ).to_dict()
+
+    def build_multichain_fund_flow_graph(
+        self,
+        address: str,
+        chain_ids: Optional[List[int]] = None,
+        max_rows: int = DEFAULT_MAX_ROWS,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        deadline_ms: Optional[int] = None,
+        max_calls: Optional[int] = None
+    ) -> Graph:
+        # Block numbers differ per chain, so a multi-chain window is expressed in time only
+        chain_ids = sorted(set(chain_ids)) if chain_ids else list(SUPPORTED_CHAIN_IDS)
+        unsupported = [chain_id for chain_id in chain_ids if chain_id not in SUPPORTED_CHAIN_IDS]
+        if unsupported:
+            raise ValueError(f"Unsupported chain ids: {', '.join(map(str, unsupported))}")
+        window = {
+            'max_rows': max_rows,
+            'start_time': start_time,
+            'end_time': end_time
+        }
+        key = ('fund-flow-multichain', address.lower(), tuple(chain_ids), *window.values(), deadline_ms, max_calls)
+
+        return self.in_flight.do(
+            key,
+            lambda: self._build_multichain_fund_flow_graph(
+                address=address,
+                chain_ids=chain_ids,
+                budget=self._make_budget(deadline_ms=deadline_ms, max_calls=max_calls),
+                **window
+            )
+        )
 
-        result = w3.eth.get_transaction(transaction_hash=tx_hash)
-        input_data = result['input']
+    def _build_multichain_fund_flow_graph(
+        self,
+        address: str,
+        chain_ids: List[int],
+        budget: Optional[TraceBudget],
+        **window
+    ) -> Graph:
+        graph = Graph()
+
+        completed, errors = self.traversal.fetch_chains(
+            chain_ids=chain_ids,
+            address=address,
+            on_rows=lambda chain_id, action, txs: self._add_txs(graph=graph, chain_id=chain_id, txs=txs, action=action),
+            actions=FUND_FLOW_ACTIONS,
+            budget=budget,
+            **window
+        )
+
+        graph.metadata['chains'] = chain_ids
+        graph.metadata['failed_chains'] = {str(chain_id): error for chain_id, error in errors.items()}
+
+        if budget is not None:
+            unexplored = [
+                make_node_id(chain_id, address)
+                for chain_id in chain_ids
+                if len(completed[chain_id]) < len(FUND_FLOW_ACTIONS)
+            ]
+            self._set_trace_metadata(
+                graph=graph,
+                budget=budget,
+                hops_completed=0 if unexplored else 1,
+                unexplored=unexplored
+            )
+
+        return graph
+
+    def analyze_bridge_transaction(self, chain_id: int, tx_hash: str) -> Dict[str, Any]:
+        return self.build_bridge_graph(chain_id=chain_id, tx_hash=tx_hash).to_dict()
+
+    def build_bridge_graph(self, chain_id: int, tx_hash: str) -> Graph:
+        dst_chain_id, recipient = self.decode_bridge_transaction(chain_id=chain_id, tx_hash=tx_hash)
+
+        return self.build_fund_flow_graph(chain_id=dst_chain_id, address=recipient)
+
+    def analyze_bridge_transactions(self, transactions: List[Tuple[int, str]]) -> List[Dict[str, Any]]:
+        # Errors stay on their own entry so one bad hash does not fail the batch
+        entries = [{'chain_id': chain_id, 'tx_hash': tx_hash} for chain_id, tx_hash in transactions]
+        decoded: Dict[int, Tuple[Optional[int], str]] = {}
+        pending: Dict[int, List[int]] = {}
+
+        for index, (chain_id, tx_hash) in enumerate(transactions):
+            cached = self.bridge_cache.get(chain_id=chain_id, tx_hash=tx_hash)
+            if cached is not None:
+                decoded[index] = cached
+            else:
+                pending.setdefault(chain_id, []).append(index)
+
+        with ThreadPoolExecutor(max_workers=self.traversal.max_workers) as executor:
+            batches = {
+                chain_id: executor.submit(
+                    self.web3_pool.get_transactions,
+                    chain_id,
+                    [transactions[index][1] for index in indexes]
+                )
+                for chain_id, indexes in pending.items()
+            }
+
+            decodes = {}
+            for chain_id, future in batches.items():
+                try:
+                    txs, errors = future.result()
+                except Exception as e:
+                    txs, errors = {}, {transactions[index][1].lower(): str(e) for index in pending[chain_id]}
+
+                for index in pending[chain_id]:
+                    tx_hash = transactions[index][1]
+                    tx = txs.get(tx_hash.lower())
+                    if tx is None:
+                        entries[index]['error'] = errors[tx_hash.lower()]
+                        continue
+                    decodes[index] = executor.submit(self._decode_bridge_tx, chain_id, tx_hash, tx)
+
+            for index, future in decodes.items():
+                try:
+                    decoded[index] = future.result()
+                except Exception as e:
+                    entries[index]['error'] = str(e)
+
+            # Hashes that bridge to the same recipient share one fund-flow lookup
+            flows = {}
+            for index, (dst_chain_id, recipient) in decoded.items():
+                entries[index]['dst_chain_id'] = dst_chain_id
+                entries[index]['recipient'] = recipient
+
+                key = (dst_chain_id, recipient.lower())
+                if key not in flows:
+                    flows[key] = executor.submit(self.build_fund_flow_graph, chain_id=dst_chain_id, address=recipient)
+
+            for index, (dst_chain_id, recipient) in decoded.items():
+                try:
+                    entries[index]['data'] = flows[(dst_chain_id, recipient.lower())].result().to_dict()
+                except Exception as e:
+                    entries[index]['error'] = str(e)
+
+        return entries
+
+    def decode_bridge_transaction(self, chain_id: int, tx_hash: str) -> Tuple[Optional[int], str]:
+        # A bridge tx never changes, so a cached decode skips the RPC and protocol API calls entirely
+        decoded = self.bridge_cache.get(chain_id=chain_id, tx_hash=tx_hash)
+        if decoded is not None:
+            return decoded
+
+        tx = self.web3_pool.get(chain_id).eth.get_transaction(transaction_hash=tx_hash)
+        return self._decode_bridge_tx(chain_id=chain_id, tx_hash=tx_hash, tx=tx)
+
+    def _decode_bridge_tx(self, chain_id: int, tx_hash: str, tx: Dict[str, Any]) -> Tuple[Optional[int], str]:
+        input_data = tx['input']
         methodId = input_data[:10]
 
-        bridge = BRIDGE_METHODS[methodId]['label']
-        if bridge == 'DeBridge':
-            dst_chain_id, recipient = debridge.decode_bridge_transaction(tx_hash=tx_hash)
-        elif bridge == 'USDT0':
-            dst_chain_id, recipient = usdt0.decode_bridge_transaction(tx_hash=tx_hash, chain_id=chain_id)
-        else:
-            raise NotImplementedError(f"Bridge protocol '{bridge}' not yet implemented")
+        method = get_method(methodId)
+        if method is None or method.tx_type != TxTypes.BRIDGE:
+            raise ValueError(f"Method '{methodId}' is not a known bridge method")
 
-        return self.get_fund_flow_by_address(chain_id=dst_chain_id, address=recipient)
+        decoder = BRIDGE_DECODERS.get(method.decoder)
+        if decoder is None:
+            raise NotImplementedError(f"Bridge protocol '{method.protocol or method.label}' not yet implemented")
 
-    def get_multihop_fund_flow_for_scoring(
+        return self.bridge_cache.put(
+            chain_id=chain_id,
+            tx_hash=tx_hash,
+            decoder=method.decoder,
+            decoded=decoder(tx_hash=tx_hash, chain_id=chain_id, tx=tx)
+        )
+
+    def get_connecting_paths(
         self,
         chain_id: int,
-        address: str,
-        max_hops: int = 1,
-        max_addresses_per_direction: int = 10
+        source: str,
+        target: str,
+        max_hops: int = 4,
+        max_rows_per_address: int = DEFAULT_SCORING_MAX_ROWS,
+        max_paths: int = DEFAULT_MAX_PATHS,
+        deadline_ms: Optional[int] = None,
+        max_calls: Optional[int] = None
     ) -> Dict[str, Any]:
-        graph = ScoringGraph()
-        visited_addresses = set()
+        return self.build_connecting_path_graph(
+            chain_id=chain_id,
+            source=source,
+            target=target,
+            max_hops=max_hops,
+            max_rows_per_address=max_rows_per_address,
+            max_paths=max_paths,
+            deadline_ms=deadline_ms,
+            max_calls=max_calls
+        ).to_dict()
+
+    def build_connecting_path_graph(
+        self,
+        chain_id: int,
+        source: str,
+        target: str,
+        max_hops: int = 4,
+        max_rows_per_address: int = DEFAULT_SCORING_MAX_ROWS,
+        max_paths: int = DEFAULT_MAX_PATHS,
+        deadline_ms: Optional[int] = None,
+        max_calls: Optional[int] = None
+    ) -> Graph:
+        key = (
+            'paths', chain_id, source.lower(), target.lower(), max_hops,
+            max_rows_per_address, max_paths, deadline_ms, max_calls
+        )
 
-        main_address = address.lower()
-        current_hop_addresses = {main_address}
+        return self.in_flight.do(
+            key,
+            lambda: self._build_connecting_path_graph(
+                chain_id=chain_id,
+                source=source.lower(),
+                target=target.lower(),
+                max_hops=max_hops,
+                max_rows_per_address=max_rows_per_address,
+                max_paths=max_paths,
+                budget=self._make_budget(deadline_ms=deadline_ms, max_calls=max_calls)
+            )
+        )
 
-        for hop in range(max_hops):
-            next_hop_addresses = set()
+    def _build_connecting_path_graph(
+        self,
+        chain_id: int,
+        source: str,
+        target: str,
+        max_hops: int,
+        max_rows_per_address: int,
+        max_paths: int,
+        budget: Optional[TraceBudget]
+    ) -> Graph:
+        graph = Graph()
+        # Forward links point back toward the source along outgoing transfers,
+        # backward links point on toward the target along incoming ones
+        forward: Dict[str, Set[str]] = {source: set()}
+        backward: Dict[str, Set[str]] = {target: set()}
+        depths = {True: {source: 0}, False: {target: 0}}
+        side_depths = {True: 0, False: 0}
+        frontiers = {True: [source], False: [target]}
+        sampled = set()
+        meeting = {source} & {target}
+        unexplored = []
+        failed = {}
+        hops_completed = 0
+        addresses_fetched = 0
+
+        while not meeting and hops_completed < max_hops and frontiers[True] and frontiers[False]:
+            if budget is not None and budget.exhausted:
+                unexplored = frontiers[True] + frontiers[False]
+                break
 
-            for current_address in current_hop_addresses:
-                if current_address in visited_addresses:
-                    continue
+            # Growing the smaller side keeps the number of fetched addresses down
+            is_forward = len(frontiers[True]) <= len(frontiers[False])
+            frontier = frontiers[is_forward]
+            links, other = (forward, backward) if is_forward else (backward, forward)
+            side_depths[is_forward] += 1
+
+            sample_rows = min(self.expansion_policy.sample_rows, max_rows_per_address)
+            completed, errors = self.traversal.fetch_frontier(
+                chain_id=chain_id,
+                addresses=frontier,
+                on_rows=lambda _, action, txs: self._add_txs(graph=graph, chain_id=chain_id, txs=txs, action=action),
+                actions=SCORING_ACTIONS,
+                address_options={address: {'max_rows': sample_rows} for address in frontier if address in sampled},
+                budget=budget,
+                max_rows=max_rows_per_address
+            )
+            addresses_fetched += len(frontier)
+            failed.update(errors)
+
+            next_level: Dict[str, Set[str]] = {}
+            for address in frontier:
+                if is_forward:
+                    neighbours = {edge.TO_ADDRESS for edge in graph.out_edges(address, chain_id)}
+                else:
+                    neighbours = {edge.FROM_ADDRESS for edge in graph.in_edges(address, chain_id)}
 
-                visited_addresses.add(current_address)
+                for neighbour in neighbours:
+                    if neighbour and neighbour not in links:
+                        next_level.setdefault(neighbour, set()).add(address)
 
-                connected_addresses = self._get_fund_flow_for_scoring(
-                    graph=graph,
-                    chain_id=chain_id,
-                    address=current_address
-                )
+            links.update(next_level)
+            depths[is_forward].update((address, side_depths[is_forward]) for address in next_level)
+            hops_completed += 1
+            meeting = set(next_level) & set(other)
 
-                next_hop_addresses.update(connected_addresses)
+            unexplored = [address for address in frontier if len(completed[address]) < len(SCORING_ACTIONS)]
+            if unexplored:
+                break
 
-            current_hop_addresses = next_hop_addresses
+            next_frontier = []
+            for address in sorted(next_level):
+                mode, hub = self.expansion_policy.decide(graph=graph, chain_id=chain_id, address=address)
+                if hub is not None and mode == HubMode.LEAF:
+                    continue
+                if hub is not None:
+                    sampled.add(address)
+                next_frontier.append(address)
+            frontiers[is_forward] = next_frontier
+
+        path_graph = Graph()
+        paths = []
+        distance = None
+
+        if meeting:
+            distance = min(depths[True][address] + depths[False][address] for address in meeting)
+            shortest = sorted(
+                address for address in meeting
+                if depths[True][address] + depths[False][address] == distance
+            )
+            for address in shortest:
+                for head in _iter_paths(forward, address, source):
+                    remaining = max_paths - len(paths)
+                    if remaining <= 0:
+                        break
+                    paths.extend(
+                        head[::-1] + tail[1:]
+                        for tail in islice(_iter_paths(backward, address, target), remaining)
+                    )
+
+            for path in paths:
+                self._add_path_edges(path_graph=path_graph, graph=graph, chain_id=chain_id, path=path)
+
+        path_graph.metadata['connected'] = bool(meeting)
+        path_graph.metadata['distance'] = distance
+        path_graph.metadata['paths'] = paths
+        path_graph.metadata['addresses_fetched'] = addresses_fetched
+        path_graph.metadata['failed_addresses'] = {address: failed[address] for address in sorted(failed)}
+        self._set_trace_metadata(
+            graph=path_graph,
+            budget=budget,
+            hops_completed=hops_completed,
+            unexplored=unexplored
+        )
+        return path_graph
 
-            if not current_hop_addresses:
-                break
+    def _add_path_edges(self, path_graph: Graph, graph: Graph, chain_id: int, path: List[str]) -> None:
+        for from_address, to_address in zip(path, path[1:]):
+            path_graph.add_node(from_address, chain_id)
+            path_graph.add_node(to_address, chain_id)
 
-        return graph.to_dict()
+            for edge in graph.out_edges(from_address, chain_id):
+                if edge.TO_ADDRESS != to_address:
+                    continue
+                path_graph.add_edge(
+                    chain_id=edge.CHAIN_ID,
+                    tx_hash=edge.TX_HASH,
+                    block_height=edge.BLOCK_HEIGHT,
+                    from_address=edge.FROM_ADDRESS,
+                    to_address=edge.TO_ADDRESS,
+                    amount=edge.AMOUNT,
+                    timestamp=edge.TIMESTAMP,
+                    token_address=edge.TOKEN_ADDRESS,
+                    token_symbol=edge.TOKEN_SYMBOL,
+                    usd_value=edge.USD_VALUE,
+                    tx_type=edge.TX_TYPE,
+                    log_index=edge.LOG_INDEX
+                )
 
-    def _get_fund_flow_for_scoring(
+    def get_multihop_fund_flow_for_scoring(
         self,
-        graph: ScoringGraph,
         chain_id: int,
-        address: str
-    ) -> set[str]:
-        connected_addresses = set()
-        address_lower = address.lower()
+        address: str,
+        max_hops: int = 1,
+        max_addresses_per_direction: int = 10,
+        max_rows_per_address: int = DEFAULT_SCORING_MAX_ROWS,
+        rank_by: str = RankBy.USD,
+        deadline_ms: Optional[int] = None,
+        max_calls: Optional[int] = None,
+        follow_bridges: bool = True
+    ) -> Dict[str, Any]:
+        return self.build_scoring_graph(
+            chain_id=chain_id,
+            address=address,
+            max_hops=max_hops,
+            max_addresses_per_direction=max_addresses_per_direction,
+            max_rows_per_address=max_rows_per_address,
+            rank_by=rank_by,
+            deadline_ms=deadline_ms,
+            max_calls=max_calls,
+            follow_bridges=follow_bridges
+        ).to_dict()
+
+    def build_scoring_graph(
+        self,
+        chain_id: int,
+        address: str,
+        max_hops: int = 1,
+        max_addresses_per_direction: int = 10,
+        max_rows_per_address: int = DEFAULT_SCORING_MAX_ROWS,
+        rank_by: str = RankBy.USD,
+        deadline_ms: Optional[int] = None,
+        max_calls: Optional[int] = None,
+        follow_bridges: bool = True,
+        on_hop: Optional[HopCallback] = None
+    ) -> ScoringGraph:
+        key = (
+            'scoring', chain_id, address.lower(), max_hops, max_addresses_per_direction,
+            max_rows_per_address, rank_by, deadline_ms, max_calls, follow_bridges
+        )
 
-        try:
-            normal_txs = self._fetch_normal_txs(chain_id=chain_id, address=address)
+        def build() -> ScoringGraph:
+            return self._build_scoring_graph(
+                chain_id=chain_id,
+                address=address,
+                max_hops=max_hops,
+                max_addresses_per_direction=max_addresses_per_direction,
+                max_rows_per_address=max_rows_per_address,
+                rank_by=rank_by,
+                budget=self._make_budget(deadline_ms=deadline_ms, max_calls=max_calls),
+                follow_bridges=follow_bridges,
+                on_hop=on_hop
+            )
+
+        # A coalesced follower would never see the leader's hop callbacks
+        return build() if on_hop else self.in_flight.do(key, build)
+
+    def _build_scoring_graph(
+        self,
+        chain_id: int,
+        address: str,
+        max_hops: int,
+        max_addresses_per_direction: int,
+        max_rows_per_address: int,
+        rank_by: str,
+        budget: Optional[TraceBudget],
+        follow_bridges: bool,
+        on_hop: Optional[HopCallback]
+    ) -> ScoringGraph:
+        graph = ScoringGraph()
+        visited_nodes = set()
+        sampled_nodes = set()
+        unexpanded = {}
+        unexplored = []
+        failed = {}
+        bridges = []
+        undecoded = []
+        hops_completed = 0
+
+        # Nodes are (chain_id, address) pairs so a bridge hop can carry the trace onto another chain
+        current_hop_nodes = {(chain_id, address.lower())}
 
-            for tx in normal_txs:
-                from_addr = tx.get('from', '').lower()
-                to_addr = tx.get('to', '').lower()
+        for hop in range(max_hops):
+            frontier = sorted(current_hop_nodes - visited_nodes)
+            if not frontier:
+                break
+            if budget is not None and budget.exhausted:
+                unexplored = frontier
+                break
 
-                self._add_nodes_from_tx_for_scoring(graph=graph, chain_id=chain_id, tx=tx)
-                self._add_edge_from_tx_for_scoring(graph=graph, chain_id=chain_id, tx=tx)
+            visited_nodes.update(frontier)
+            sample_rows = min(self.expansion_policy.sample_rows, max_rows_per_address)
+            ranker = FrontierRanker(rank_by=rank_by)
+            bridge_txs = []
 
-                if to_addr == address_lower and from_addr:
-                    connected_addresses.add(from_addr)
-                if from_addr == address_lower and to_addr:
-                    connected_addresses.add(to_addr)
-        except Exception as e:
-            print(f"Error fetching normal txs for {address}: {e}")
+            def merge(node: Tuple[int, str], action: str, txs: List[Dict[str, Any]]) -> None:
+                bridge_txs.extend(self._add_history_for_scoring(
+                    graph=graph,
+                    chain_id=node[0],
+                    address=node[1],
+                    action=action,
+                    txs=txs,
+                    ranker=ranker
+                ))
+
+            completed, errors = self.traversal.fetch_nodes(
+                nodes=frontier,
+                on_rows=merge,
+                actions=SCORING_ACTIONS,
+                node_options={
+                    node: {'max_rows': sample_rows}
+                    for node in frontier
+                    if node in sampled_nodes
+                },
+                budget=budget,
+                max_rows=max_rows_per_address
+            )
+            failed.update(errors)
+
+            links = []
+            if follow_bridges:
+                links, skipped = self._decode_bridge_txs(bridge_txs, budget=budget)
+                undecoded.extend(skipped)
+            destinations = set()
+            for link in links:
+                graph.add_node(link['recipient'], link['dst_chain_id'])
+                destinations.add((link['dst_chain_id'], link['recipient']))
+            bridges.extend(links)
+
+            for candidate in sorted((ranker.candidates() | destinations) - visited_nodes):
+                mode, hub = self.expansion_policy.decide(graph=graph, chain_id=candidate[0], address=candidate[1])
+                if hub is None:
+                    continue
 
-        try:
-            erc20_txs = self._fetch_erc20_transfers(chain_id=chain_id, address=address)
-
-            for tx in erc20_txs:
-                from_addr = tx.get('from', '').lower()
-                to_addr = tx.get('to', '').lower()
-
-                self._add_nodes_from_tx_for_scoring(graph=graph, chain_id=chain_id, tx=tx)
-                self._add_edge_from_tx_for_scoring(graph=graph, chain_id=chain_id, tx=tx)
-
-                if to_addr == address_lower and from_addr:
-                    connected_addresses.add(from_addr)
-                if from_addr == address_lower and to_addr:
-                    connected_addresses.add(to_addr)
-        except Exception as e:
-            print(f"Error fetching ERC20 txs for {address}: {e}")
-
-        return connected_addresses
-
-    def _add_nodes_from_tx_for_scoring(self, graph: ScoringGraph, chain_id: int, tx: Dict[str, Any]) -> None:
-        from_address = tx['from']
-        to_address = tx['to']
-
-        for address in [from_address, to_address]:
-            graph.add_node(address, chain_id)
-
-    def _add_edge_from_tx_for_scoring(self, graph: ScoringGraph, chain_id: int, tx: Dict[str, Any]) -> None:
-        token_symbol = tx.get('tokenSymbol')
-        action = "tokentx" if token_symbol else "txlist"
-
-        tx_type = self._classify_tx_type(tx=tx, action=action)
-        if tx_type == TxTypes.UNKNOWN:
-            return
-
-        amount = int(tx['value'])
-        token_address = ''
-        block_height = int(tx['blockNumber'])
-        
-        usd_value = 0
-
-        if tx_type == TxTypes.NATIVE:
-            amount_float = amount / 10 ** NATIVE_TOKEN_DECIMALS
-            amount = str(amount_float)
-            token_symbol = 'ETH'
-            try:
-                eth_price_data = get_token_price("ETH")
-                if eth_price_data:
-                    usd_value = amount_float * eth_price_data["price"]
-                else:
-                    usd_value = amount_float * 2000
-            except Exception as e:
-                print(f"Warning: Failed to get ETH price: {e}")
-                usd_value = amount_float * 2000
-        elif tx_type == TxTypes.ERC20_TRANSFER:
-            decimals = int(tx['tokenDecimal'])
-            amount_float = amount / 10 ** decimals
-            amount = str(amount_float)
-            token_address = tx['contractAddress']
-            token_symbol = tx.get('tokenSymbol', 'UNKNOWN')
-            try:
-                token_price_data = get_token_price(token_symbol)
-                if token_price_data:
-                    usd_value = amount_float * token_price_data["price"]
+                unexpanded[candidate] = hub
+                if mode == HubMode.LEAF:
+                    visited_nodes.add(candidate)
                 else:
-                    usd_value = 0
-            except Exception as e:
-                print(f"Warning: Failed to get {token_symbol} price: {e}")
-                usd_value = 0
-        elif tx_type in (TxTypes.BRIDGE, TxTypes.SWAP):
-            amount = str(amount)
-            usd_value = 0
-
-        graph.add_edge(
-            chain_id=chain_id,
-            tx_hash=tx['hash'],
-            block_height=block_height,
-            from_address=tx['from'],
-            to_address=tx['to'],
-            amount=amount,
-            timestamp=tx['timeStamp'],
-            token_address=token_address,
-            token_symbol=token_symbol,
-            usd_value=usd_value,
-            tx_type=tx_type
-        )
+                    sampled_nodes.add(candidate)
 
-    def _add_nodes_from_tx(self, graph: Graph, chain_id: int, tx: Dict[str, Any]) -> None:
-        from_address = tx['from']
-        to_address = tx['to']
-
-        for address in [from_address, to_address]:
-            graph.add_node(address, chain_id)
-
-    def _add_edge_from_tx(self, graph: Graph, chain_id: int, tx: Dict[str, Any]) -> None:
-        token_symbol = tx.get('tokenSymbol')
-        action = "tokentx" if token_symbol else "txlist"
-
-        tx_type = self._classify_tx_type(tx=tx, action=action)
-        if tx_type == TxTypes.UNKNOWN:
-            return
-
-        amount = int(tx['value'])
-        token_address = ''
-        block_height = int(tx['blockNumber'])
-        
-        usd_value = 0
-
-        if tx_type == TxTypes.NATIVE:
-            amount_float = amount / 10 ** NATIVE_TOKEN_DECIMALS
-            amount = str(amount_float)
-            token_symbol = 'ETH'
-            try:
-                eth_price_data = get_token_price("ETH")
-                if eth_price_data:
-                    usd_value = amount_float * eth_price_data["price"]
-                else:
-                    usd_value = amount_float * 2000
-            except Exception as e:
-                print(f"Warning: Failed to get ETH price: {e}")
-                usd_value = amount_float * 2000
-        elif tx_type == TxTypes.ERC20_TRANSFER:
-            decimals = int(tx['tokenDecimal'])
-            amount_float = amount / 10 ** decimals
-            amount = str(amount_float)
-            token_address = tx['contractAddress']
-            token_symbol = tx.get('tokenSymbol', 'UNKNOWN')
-            try:
-                token_price_data = get_token_price(token_symbol)
-                if token_price_data:
-                    usd_value = amount_float * token_price_data["price"]
-                else:
-                    usd_value = 0
-            except Exception as e:
-                print(f"Warning: Failed to get {token_symbol} price: {e}")
-                usd_value = 0
-        elif tx_type in (TxTypes.BRIDGE, TxTypes.SWAP):
-            amount = str(amount)
-            usd_value = 0
-
-        graph.add_edge(
-            chain_id=chain_id,
-            tx_hash=tx['hash'],
-            block_height=block_height,
-            from_address=tx['from'],
-            to_address=tx['to'],
-            amount=amount,
-            timestamp=tx['timeStamp'],
-            token_address=token_address,
-            token_symbol=token_symbol,
-            usd_value=usd_value,
-            tx_type=tx_type
-        )
+            unexplored = [node for node in frontier if len(completed[node]) < len(SCORING_ACTIONS)]
+            if unexplored:
+                break
 
-    def _fetch_normal_txs(self, chain_id: int, address: str) -> list:
-        time.sleep(0.4)
-        return self.scanner.get_normal_transactions(
-            chain_id=chain_id,
-            address=address,
-            startblock=DEFAULT_START_BLOCK,
-            endblock=DEFAULT_END_BLOCK,
-            sort='desc'
+            hops_completed += 1
+            if on_hop:
+                on_hop(graph, hop, self._node_names(chain_id, frontier))
+            # Bridged funds are always followed; they are the hop the trace exists to find
+            current_hop_nodes = ranker.select(
+                limit=max_addresses_per_direction,
+                exclude=visited_nodes
+            ) | (destinations - visited_nodes)
+
+        graph.metadata['unexpanded'] = list(unexpanded.values())
+        failed_nodes = sorted(failed)
+        graph.metadata['failed_nodes'] = {
+            name: failed[node] for name, node in zip(self._node_names(chain_id, failed_nodes), failed_nodes)
+        }
+        if follow_bridges:
+            graph.metadata['bridges'] = bridges
+            graph.metadata['undecoded_bridges'] = undecoded
+        self._set_trace_metadata(
+            graph=graph,
+            budget=budget,
+            hops_completed=hops_completed,
+            unexplored=self._node_names(chain_id, unexplored)
         )
+        return graph
+
+    @staticmethod
+    def _node_names(chain_id: int, nodes: List[Tuple[int, str]]) -> List[str]:
+        # Addresses on the starting chain keep their plain form; bridged ones carry their chain
+        return [
+            node_address if node_chain_id == chain_id else make_node_id(node_chain_id, node_address)
+            for node_chain_id, node_address in nodes
+        ]
+
+    def _decode_bridge_txs(
+        self,
+        bridge_txs: List[Tuple[int, Dict[str, Any]]],
+        budget: Optional[TraceBudget]
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        # Returns the decoded links and the bridge txs the budget left undecoded
+        if not bridge_txs:
+            return [], []
+
+        def decode(chain_id: int, tx: Dict[str, Any]) -> Optional[Tuple[Optional[int], str]]:
+            decoded = self.bridge_cache.get(chain_id=chain_id, tx_hash=tx['hash'])
+            if decoded is None:
+                # Etherscan rows carry the calldata, but a decoder may still call its protocol API; one call per miss
+                if budget is not None:
+                    budget.charge()
+                decoded = self._decode_bridge_tx(chain_id=chain_id, tx_hash=tx['hash'], tx=tx)
+            return decoded
+
+        links = []
+        undecoded = []
+        executor = ThreadPoolExecutor(max_workers=min(self.traversal.max_workers, len(bridge_txs)))
+        futures = []
+        try:
+            futures = [(chain_id, tx, executor.submit(decode, chain_id, tx)) for chain_id, tx in bridge_txs]
+            timeout = budget.remaining_seconds() if budget is not None else None
+            done, _ = wait([future for _, _, future in futures], timeout=timeout)
+
+            for chain_id, tx, future in futures:
+                try:
+                    if future not in done:
+                        raise BudgetExhausted('Trace deadline passed')
+                    decoded = future.result()
+                except BudgetExhausted:
+                    undecoded.append({'chain_id': chain_id, 'tx_hash': tx['hash']})
+                    continue
+                except Exception as e:
+                    print(f"Error decoding bridge tx {tx['hash']} on chain {chain_id}: {e}")
+                    continue
+
+                if decoded is None or decoded[0] is None or not decoded[1]:
+                    continue
 
-    def _fetch_erc20_transfers(self, chain_id: int, address: str) -> list:
-        time.sleep(0.4)
-        return self.scanner.get_erc20_transfers(
+                links.append({
+                    'chain_id': chain_id,
+                    'tx_hash': tx['hash'],
+                    'from_address': tx['from'].lower(),
+                    'dst_chain_id': decoded[0],
+                    'recipient': decoded[1].lower()
+                })
+        finally:
+            for _, _, future in futures:
+                future.cancel()
+            # A decoder stuck on its protocol API must not hold the trace past its deadline
+            executor.shutdown(wait=budget is None or not budget.exhausted)
+
+        by_tx = itemgetter('chain_id', 'tx_hash')
+        return sorted(links, key=by_tx), sorted(undecoded, key=by_tx)
+
+    def _make_budget(self, deadline_ms: Optional[int], max_calls: Optional[int]) -> Optional[TraceBudget]:
+        if deadline_ms is None and max_calls is None:
+            return None
+        return TraceBudget(deadline_ms=deadline_ms, max_calls=max_calls)
+
+    def _set_trace_metadata(
+        self,
+        graph: Union[Graph, ScoringGraph],
+        budget: Optional[TraceBudget],
+        hops_completed: int,
+        unexplored: List[str]
+    ) -> None:
+        graph.metadata['hops_completed'] = hops_completed
+        graph.metadata['unexplored'] = unexplored
+        graph.metadata['partial'] = bool(unexplored)
+        if budget is not None:
+            graph.metadata['budget'] = budget.to_dict()
+
+    def _add_history_for_scoring(
+        self,
+        graph: ScoringGraph,
+        chain_id: int,
+        address: str,
+        action: str,
+        txs: List[Dict[str, Any]],
+        ranker: FrontierRanker
+    ) -> List[Tuple[int, Dict[str, Any]]]:
+        address_lower = address.lower()
+        bridge_txs = []
+        usd_values = self._add_txs(graph=graph, chain_id=chain_id, txs=txs, action=action)
+
+        for tx, usd_value in zip(txs, usd_values):
+            from_addr = tx.get('from', '').lower()
+            to_addr = tx.get('to', '').lower()
+            timestamp = int(tx.get('timeStamp') or 0)
+
+            if to_addr == address_lower and from_addr:
+                ranker.record(INCOMING, (chain_id, from_addr), usd_value, timestamp)
+            if from_addr == address_lower and to_addr:
+                ranker.record(OUTGOING, (chain_id, to_addr), usd_value, timestamp)
+                if action == 'txlist' and tx.get('isError') != '1' and self._is_decodable_bridge_call(tx):
+                    bridge_txs.append((chain_id, tx))
+
+        return bridge_txs
+
+    @staticmethod
+    def _is_decodable_bridge_call(tx: Dict[str, Any]) -> bool:
+        method = get_method(tx.get('methodId') or tx.get('input', '')[:10])
+        return method is not None and method.tx_type == TxTypes.BRIDGE and method.decoder in BRIDGE_DECODERS
+
+    def _add_txs(self, graph: Union[Graph, ScoringGraph], chain_id: int, txs: List[Dict[str, Any]], action: str) -> List[float]:
+        for tx in txs:
+            graph.add_node(tx['from'], chain_id)
+            graph.add_node(tx['to'], chain_id)
+
+        batch, usd_values = build_edge_batch(
             chain_id=chain_id,
-            address=address,
-            startblock=DEFAULT_START_BLOCK,
-            endblock=DEFAULT_END_BLOCK,
-            sort='desc'
+            txs=txs,
+            action=action,
+            price_history=self.price_history
         )
+        graph.add_edges(batch)
+        return usd_values
 
-    def _classify_tx_type(self, tx: Dict[str, Any], action: str) -> str:
-        input_data = tx['input']
-        method_id = tx['methodId']
-
-        if action == "tokentx":
-            if method_id == Methods.ERC20_TRANSFER:
-                return TxTypes.ERC20_TRANSFER
+    def _fetch_normal_txs(self, chain_id: int, address: str, **window) -> Iterator[Dict[str, Any]]:
+        return self._iter_history(chain_id=chain_id, address=address, action='txlist', **window)
 
-        elif action == "txlist":
-            if input_data == '0x':
-                return TxTypes.NATIVE
+    def _fetch_erc20_transfers(self, chain_id: int, address: str, **window) -> Iterator[Dict[str, Any]]:
+        return self._iter_history(chain_id=chain_id, address=address, action='tokentx', **window)
 
-        if method_id in SWAP_METHODS:
-            return TxTypes.SWAP
-        elif method_id in BRIDGE_METHODS:
-            return TxTypes.BRIDGE
+    def _fetch_internal_txs(self, chain_id: int, address: str, **window) -> Iterator[Dict[str, Any]]:
+        return self._iter_history(chain_id=chain_id, address=address, action='txlistinternal', **window)
 
-        return TxTypes.UNKNOWN
+    def _iter_history(
+        self,
+        chain_id: int,
+        address: str,
+        action: str,
+        max_rows: int = DEFAULT_MAX_ROWS,
+        start_block: int = DEFAULT_START_BLOCK,
+        end_block: int = DEFAULT_END_BLOCK,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        budget: Optional[TraceBudget] = None
+    ) -> Iterator[Dict[str, Any]]:
+        return self.scanner.iter_history(
+            chain_id=chain_id,
+            address=address,
+            action=action,
+            startblock=start_block,
+            endblock=end_block,
+            start_time=start_time,
+            end_time=end_time,
+            max_rows=max_rows,
+            sort='desc',
+            budget=budget
+        )
@@ -1,30 +1,372 @@
 import requests
-from typing import Dict, Any, List
+import threading
+import time
+from collections import OrderedDict
+from itertools import islice
+from typing import Dict, Any, Callable, Iterator, List, Optional, Tuple, TypeVar
+
+from src.api.key_pool import ApiKeyPool, parse_api_keys
+from src.api.traversal import BudgetExhausted, TraceBudget
+from src.api.tx_store import StoreKey, TxStore, TX_STORE_PATH, row_key
+from src.utils.single_flight import SingleFlight
+
+T = TypeVar('T')
+
+MAX_RATE_LIMIT_RETRIES = 5
+HISTORY_ACTIONS = ('txlist', 'tokentx', 'txlistinternal')
+MAX_RESULT_WINDOW = 10000  # Etherscan rejects page * offset above this
+DEFAULT_PAGE_SIZE = 1000
+BLOCK_BY_TIME_CACHE_SIZE = 4096
+# Lookups this close to now can still move as new blocks arrive, so they are not memoized
+BLOCK_BY_TIME_SETTLE_SECONDS = 300
+
+def _is_rate_limited(data: Dict[str, Any]) -> bool:
+    if data.get('status') != '0':
+        return False
+    return 'rate limit' in str(data.get('result', '')).lower()
+
+def _is_daily_limited(data: Dict[str, Any]) -> bool:
+    return _is_rate_limited(data) and 'daily' in str(data.get('result', '')).lower()
+
+def _open_default_store() -> Optional[TxStore]:
+    if not TX_STORE_PATH:
+        return None
+
+    try:
+        return TxStore(TX_STORE_PATH)
+    except Exception as e:
+        print(f"Warning: Etherscan transaction store disabled: {e}")
+        return None
+
+def _min_block(rows: List[Dict[str, Any]]) -> int:
+    return min(int(row['blockNumber']) for row in rows)
+
+def _max_block(rows: List[Dict[str, Any]]) -> int:
+    return max(int(row['blockNumber']) for row in rows)
 
 class EtherscanV2Client:
     
     BASE_URL = "https://api.etherscan.io/v2/api"
     
-    def __init__(self, api_key: str):
-        self.api_key = api_key
+    def __init__(self, api_key: str, store: Optional[TxStore] = None):
+        self.key_pool = ApiKeyPool(parse_api_keys(api_key))
         self.session = requests.Session()
-    
-    def _make_request(self, params: Dict[str, Any], chain_id: int = 1) -> Dict[str, Any]:
-        params['apikey'] = self.api_key
-        params['chainid'] = chain_id  # V2 requires chainid parameter
-        
-        try:
-            response = self.session.get(self.BASE_URL, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
+        self.store = store if store is not None else _open_default_store()
+        self.in_flight = SingleFlight()
+        self._block_by_time: 'OrderedDict[Tuple[int, int, str], int]' = OrderedDict()
+        self._block_by_time_lock = threading.Lock()
+
+    def _make_request(
+        self,
+        params: Dict[str, Any],
+        chain_id: int = 1,
+        budget: Optional[TraceBudget] = None
+    ) -> Dict[str, Any]:
+        for _ in range(MAX_RATE_LIMIT_RETRIES + len(self.key_pool)):
+            # Rate-limit retries are not charged, but none start once the deadline has passed
+            if budget is not None and budget.expired:
+                raise BudgetExhausted('Trace deadline passed')
+
+            api_key = self.key_pool.acquire()
+            request_params = {
+                **params,
+                'apikey': api_key,
+                'chainid': chain_id  # V2 requires chainid parameter
+            }
+
+            try:
+                response = self.session.get(self.BASE_URL, params=request_params, timeout=10)
+                if response.status_code == 429:
+                    self._back_off(api_key)
+                    continue
+
+                response.raise_for_status()
+                data = response.json()
+            except requests.exceptions.RequestException as e:
+                raise Exception(f"Etherscan API request failed: {str(e)}")
+
+            if _is_daily_limited(data):
+                print(f"Warning: Etherscan API key ...{api_key[-4:]} reached its daily limit")
+                self.key_pool.exhaust_for_today(api_key)
+                continue
+            if _is_rate_limited(data):
+                self._back_off(api_key)
+                continue
+
+            self.key_pool.mark_success(api_key)
+
             if data.get('status') == '0' and data.get('message') == 'NOTOK':
                 raise Exception(f"Etherscan API Error: {data.get('result', 'Unknown error')}")
-            
+
             return data
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"Etherscan API request failed: {str(e)}")
-    
+
+        raise Exception("Etherscan API Error: rate limit retries exhausted")
+
+    def _back_off(self, api_key: str) -> None:
+        delay = self.key_pool.throttle(api_key)
+        print(f"Warning: Etherscan rate limit reached for key ...{api_key[-4:]}, backing off for {delay:.1f}s")
+
+    def iter_history(
+        self,
+        chain_id: int,
+        address: str,
+        action: str = 'txlist',
+        startblock: int = 0,
+        endblock: int = 99999999,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        max_rows: Optional[int] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        sort: str = 'desc',
+        budget: Optional[TraceBudget] = None
+    ) -> Iterator[Dict[str, Any]]:
+        # Every Etherscan request made for this history spends one call of the budget;
+        # BudgetExhausted is raised at the first request the budget no longer covers
+        if action not in HISTORY_ACTIONS:
+            raise ValueError(f"Unsupported history action '{action}'")
+
+        if start_time is not None:
+            startblock = max(startblock, self.get_block_number_by_time(chain_id, start_time, closest='after', budget=budget))
+        if end_time is not None:
+            endblock = min(endblock, self.get_block_number_by_time(chain_id, end_time, closest='before', budget=budget))
+        if startblock > endblock:
+            return
+
+        page_size = min(page_size, MAX_RESULT_WINDOW)
+        if max_rows is not None:
+            if max_rows <= 0:
+                return
+            page_size = min(page_size, max_rows)
+
+        params = {
+            'module': 'account',
+            'action': action,
+            'address': address
+        }
+
+        if self.store is not None and sort == 'desc':
+            key = (chain_id, address.lower(), action)
+            rows = self._iter_stored_rows(params, chain_id, key, startblock, endblock, page_size, budget)
+        else:
+            rows = self._iter_network_rows(params, chain_id, startblock, endblock, page_size, sort, budget)
+
+        yield from islice(rows, max_rows)
+
+    def _iter_stored_rows(
+        self,
+        params: Dict[str, Any],
+        chain_id: int,
+        key: StoreKey,
+        startblock: int,
+        endblock: int,
+        page_size: int,
+        budget: Optional[TraceBudget]
+    ) -> Iterator[Dict[str, Any]]:
+        state = self.store.get_sync_state(key)
+        if state is None or state[0] > state[1]:
+            yield from self._iter_new_range(params, chain_id, key, startblock, endblock, page_size, budget)
+            return
+
+        cached_first, cached_last = state
+        if endblock < cached_first - 1 or startblock > cached_last + 1:
+            # Only one synced interval is kept, so a disjoint window is served from the
+            # network rather than replacing an interval whose rows are still stored
+            yield from self._iter_network_rows(params, chain_id, startblock, endblock, page_size, 'desc', budget)
+            return
+
+        synced_last = cached_last
+        if endblock > cached_last:
+            top_block = None
+
+            for rows, exhausted in self._iter_network_pages(params, chain_id, cached_last + 1, endblock, page_size, 'desc', budget):
+                if rows and top_block is None:
+                    top_block = _max_block(rows)
+
+                # The interval only grows once the delta has been read to its end; a consumer
+                # stopping early leaves a gap between the delta rows and the synced ones
+                if exhausted and top_block is not None:
+                    cached_last = max(cached_last, top_block)
+                self.store.save(key, rows, cached_first, cached_last)
+                yield from rows
+
+        yield from self.store.iter_rows(key, max(startblock, cached_first), min(endblock, synced_last))
+
+        if cached_first <= startblock:
+            return
+
+        # The backfill extends the interval downwards page by page, so it stays contiguous
+        for rows, exhausted in self._iter_network_pages(params, chain_id, startblock, cached_first - 1, page_size, 'desc', budget):
+            if exhausted:
+                cached_first = startblock
+            elif rows:
+                cached_first = _min_block(rows) + 1
+
+            self.store.save(key, rows, cached_first, cached_last)
+            yield from rows
+
+    def _iter_new_range(
+        self,
+        params: Dict[str, Any],
+        chain_id: int,
+        key: StoreKey,
+        startblock: int,
+        endblock: int,
+        page_size: int,
+        budget: Optional[TraceBudget]
+    ) -> Iterator[Dict[str, Any]]:
+        top_block = None
+
+        for rows, exhausted in self._iter_network_pages(params, chain_id, startblock, endblock, page_size, 'desc', budget):
+            if rows and top_block is None:
+                top_block = _max_block(rows)
+
+            if top_block is not None and (exhausted or rows):
+                # The lowest block of an unfinished page may have more rows on the next one
+                first_block = startblock if exhausted else _min_block(rows) + 1
+                self.store.save(key, rows, first_block, top_block)
+            yield from rows
+
+    def _iter_network_rows(
+        self,
+        params: Dict[str, Any],
+        chain_id: int,
+        startblock: int,
+        endblock: int,
+        page_size: int,
+        sort: str,
+        budget: Optional[TraceBudget]
+    ) -> Iterator[Dict[str, Any]]:
+        for rows, _ in self._iter_network_pages(params, chain_id, startblock, endblock, page_size, sort, budget):
+            yield from rows
+
+    def _iter_network_pages(
+        self,
+        params: Dict[str, Any],
+        chain_id: int,
+        startblock: int,
+        endblock: int,
+        page_size: int,
+        sort: str,
+        budget: Optional[TraceBudget]
+    ) -> Iterator[Tuple[List[Dict[str, Any]], bool]]:
+        page = 1
+        boundary_block = None
+        boundary_keys = set()
+
+        while True:
+            if page * page_size > MAX_RESULT_WINDOW:
+                # Page window exhausted: restart paging from the last block seen,
+                # skipping the rows of that block which were already yielded.
+                window_edge = endblock if sort == 'desc' else startblock
+                if boundary_block == window_edge:
+                    print(f"Warning: Skipping rest of block {boundary_block} for {params['address']}, "
+                          f"more than {MAX_RESULT_WINDOW} rows in one block")
+                    boundary_block += -1 if sort == 'desc' else 1
+                    boundary_keys = set()
+
+                if sort == 'desc':
+                    endblock = boundary_block
+                else:
+                    startblock = boundary_block
+                page = 1
+
+                if startblock > endblock:
+                    yield [], True
+                    return
+
+            rows = self._request_rows({
+                **params,
+                'startblock': startblock,
+                'endblock': endblock,
+                'page': page,
+                'offset': page_size,
+                'sort': sort
+            }, chain_id, budget)
+            exhausted = len(rows) < page_size
+
+            fresh_rows = []
+            for row in rows:
+                block = int(row['blockNumber'])
+                key = row_key(row)
+
+                if block != boundary_block:
+                    boundary_block, boundary_keys = block, set()
+                elif key in boundary_keys:
+                    continue
+
+                boundary_keys.add(key)
+                fresh_rows.append(row)
+
+            yield fresh_rows, exhausted
+
+            if exhausted:
+                return
+            page += 1
+
+    def _fetch_rows(self, params: Dict[str, Any], chain_id: int) -> List[Dict[str, Any]]:
+        if not self._is_streamable(params):
+            return self._request_rows(params, chain_id)
+
+        limit = int(params['offset'])
+        return list(self.iter_history(
+            chain_id=chain_id,
+            address=params['address'],
+            action=params['action'],
+            startblock=int(params['startblock']),
+            endblock=int(params['endblock']),
+            max_rows=limit,
+            page_size=limit
+        ))
+
+    def _request_rows(
+        self,
+        params: Dict[str, Any],
+        chain_id: int,
+        budget: Optional[TraceBudget] = None
+    ) -> List[Dict[str, Any]]:
+        key = (chain_id, tuple(sorted((name, str(value)) for name, value in params.items())))
+        return self._coalesced(key, budget, lambda: self._request_rows_uncoalesced(params, chain_id, budget))
+
+    def _coalesced(self, key: Any, budget: Optional[TraceBudget], request: Callable[[], T]) -> T:
+        # Only the caller that actually sends the request pays for it
+        def lead() -> T:
+            if budget is not None:
+                budget.charge()
+            return request()
+
+        while True:
+            try:
+                return self.in_flight.do(key, lead)
+            except BudgetExhausted:
+                if budget is not None and budget.exhausted:
+                    raise
+                # The leader's budget ran out, not ours: send the request ourselves
+
+    def _request_rows_uncoalesced(
+        self,
+        params: Dict[str, Any],
+        chain_id: int,
+        budget: Optional[TraceBudget]
+    ) -> List[Dict[str, Any]]:
+        data = self._make_request(dict(params), chain_id, budget)
+        result = data.get('result')
+        if isinstance(result, list):
+            return result
+
+        # Anything else is an error payload; reading it as an empty page would mark the range as synced
+        if data.get('status') == '0' and 'no transactions found' in str(data.get('message', '')).lower():
+            return []
+        raise Exception(f"Etherscan API Error: {result or data.get('message', 'Unknown error')}")
+
+    @staticmethod
+    def _is_streamable(params: Dict[str, Any]) -> bool:
+        return (
+            params.get('action') in HISTORY_ACTIONS
+            and params.get('sort') == 'desc'
+            and int(params.get('page', 1)) == 1
+            and not params.get('contractaddress')
+        )
+
     def get_normal_transactions(
         self,
         chain_id: int,
@@ -46,8 +388,7 @@ class EtherscanV2Client:
             'sort': sort
         }
         
-        result = self._make_request(params, chain_id)
-        return result.get('result', [])
+        return self._fetch_rows(params, chain_id)
     
     def get_erc20_transfers(
         self,
@@ -74,8 +415,7 @@ class EtherscanV2Client:
         if contractaddress:
             params['contractaddress'] = contractaddress
         
-        result = self._make_request(params, chain_id)
-        return result.get('result', [])
+        return self._fetch_rows(params, chain_id)
     
     def get_internal_transactions(
         self,
@@ -98,8 +438,7 @@ class EtherscanV2Client:
             'sort': sort
         }
         
-        result = self._make_request(params, chain_id)
-        return result.get('result', [])
+        return self._fetch_rows(params, chain_id)
     
     def get_balance(self, chain_id: int, address: str) -> str:
         params = {
@@ -111,3 +450,36 @@ class EtherscanV2Client:
         
         result = self._make_request(params, chain_id)
         return result.get('result', '0')
+    
+    def get_block_number_by_time(
+        self,
+        chain_id: int,
+        timestamp: int,
+        closest: str = 'before',
+        budget: Optional[TraceBudget] = None
+    ) -> int:
+        key = (int(chain_id), int(timestamp), closest)
+        with self._block_by_time_lock:
+            block = self._block_by_time.get(key)
+            if block is not None:
+                self._block_by_time.move_to_end(key)
+                return block
+
+        params = {
+            'module': 'block',
+            'action': 'getblocknobytime',
+            'timestamp': timestamp,
+            'closest': closest
+        }
+
+        # Every action of a fund-flow query resolves the same window at once
+        result = self._coalesced(('getblocknobytime', key), budget, lambda: self._make_request(params, chain_id, budget))
+        block = int(result.get('result'))
+
+        if timestamp < time.time() - BLOCK_BY_TIME_SETTLE_SECONDS:
+            with self._block_by_time_lock:
+                self._block_by_time[key] = block
+                while len(self._block_by_time) > BLOCK_BY_TIME_CACHE_SIZE:
+                    self._block_by_time.popitem(last=False)
+
+        return block
@@ -0,0 +1,58 @@
+import os
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from src.enums.hub_mode_enum import HubModeEnum as HubMode
+from src.types.graph_store import GraphStore
+from src.utils.address_label import get_address_label
+
+HUB_MODE = os.getenv('ANALYZER_HUB_MODE', HubMode.LEAF)
+HUB_DEGREE = int(os.getenv('ANALYZER_HUB_DEGREE', '100'))
+HUB_SAMPLE_ROWS = int(os.getenv('ANALYZER_HUB_SAMPLE_ROWS', '20'))
+HUB_MODES = (HubMode.EXPAND, HubMode.SAMPLE, HubMode.LEAF)
+
+REASON_LABELLED = 'labelled'
+REASON_HIGH_DEGREE = 'high_degree'
+
+class ExpansionPolicy:
+    def __init__(
+        self,
+        hub_mode: str = HUB_MODE,
+        max_degree: Optional[int] = HUB_DEGREE,
+        sample_rows: int = HUB_SAMPLE_ROWS,
+        hub_labels: Optional[Sequence[str]] = None
+    ):
+        if hub_mode not in HUB_MODES:
+            raise ValueError(f"hub_mode must be one of {', '.join(HUB_MODES)}")
+
+        self.hub_mode = hub_mode
+        self.max_degree = max_degree
+        self.sample_rows = sample_rows
+        self.hub_labels = tuple(hub_labels) if hub_labels is not None else None
+
+    def decide(self, graph: GraphStore, chain_id: int, address: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+        if self.hub_mode == HubMode.EXPAND:
+            return HubMode.EXPAND, None
+
+        label = get_address_label(chain_id=chain_id, address=address)
+        degree = graph.degree(address, chain_id)
+
+        if label and self._is_hub_label(label):
+            reason = REASON_LABELLED
+        elif self.max_degree is not None and degree >= self.max_degree:
+            reason = REASON_HIGH_DEGREE
+        else:
+            return HubMode.EXPAND, None
+
+        return self.hub_mode, {
+            'address': address,
+            'chain_id': chain_id,
+            'label': label,
+            'degree': degree,
+            'reason': reason,
+            'mode': self.hub_mode
+        }
+
+    def _is_hub_label(self, label: str) -> bool:
+        if self.hub_labels is None:
+            return True
+        return label.startswith(self.hub_labels)
@@ -0,0 +1,68 @@
+import heapq
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from src.enums.rank_by_enum import RankByEnum as RankBy
+
+INCOMING = 'in'
+OUTGOING = 'out'
+RANK_BY_OPTIONS = (RankBy.USD, RankBy.RECENCY, RankBy.COUNT)
+
+# An address, or a (chain_id, address) pair when a trace spans chains
+Counterparty = Hashable
+
+class CounterpartyStats:
+    __slots__ = ('usd_value', 'last_timestamp', 'transfer_count')
+
+    def __init__(self):
+        self.usd_value = 0.0
+        self.last_timestamp = 0
+        self.transfer_count = 0
+
+    def add(self, usd_value: float, timestamp: int) -> None:
+        self.usd_value += usd_value
+        self.last_timestamp = max(self.last_timestamp, timestamp)
+        self.transfer_count += 1
+
+    def score(self, rank_by: str) -> Tuple[float, ...]:
+        if rank_by == RankBy.RECENCY:
+            return (self.last_timestamp, self.usd_value, self.transfer_count)
+        if rank_by == RankBy.COUNT:
+            return (self.transfer_count, self.usd_value, self.last_timestamp)
+        return (self.usd_value, self.transfer_count, self.last_timestamp)
+
+class FrontierRanker:
+    def __init__(self, rank_by: str = RankBy.USD):
+        if rank_by not in RANK_BY_OPTIONS:
+            raise ValueError(f"rank_by must be one of {', '.join(RANK_BY_OPTIONS)}")
+
+        self.rank_by = rank_by
+        self._stats: Dict[str, Dict[Counterparty, CounterpartyStats]] = {INCOMING: {}, OUTGOING: {}}
+
+    def record(self, direction: str, counterparty: Counterparty, usd_value: float, timestamp: int) -> None:
+        stats = self._stats[direction].get(counterparty)
+        if stats is None:
+            stats = self._stats[direction][counterparty] = CounterpartyStats()
+        stats.add(usd_value, timestamp)
+
+    def candidates(self) -> Set[Counterparty]:
+        return set(self._stats[INCOMING]) | set(self._stats[OUTGOING])
+
+    def select(self, limit: Optional[int], exclude: Iterable[Counterparty] = ()) -> Set[Counterparty]:
+        exclude = set(exclude)
+        selected = set()
+
+        for direction in (INCOMING, OUTGOING):
+            candidates = [
+                (stats.score(self.rank_by), address)
+                for address, stats in self._stats[direction].items()
+                if address not in exclude
+            ]
+            selected.update(address for _, address in self._top(candidates, limit))
+
+        return selected
+
+    @staticmethod
+    def _top(candidates: List[Tuple[Tuple[float, ...], Counterparty]], limit: Optional[int]) -> List[Tuple[Tuple[float, ...], Counterparty]]:
+        if limit is None or limit >= len(candidates):
+            return candidates
+        return heapq.nlargest(max(limit, 0), candidates)
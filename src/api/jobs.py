@@ -0,0 +1,157 @@
+import json
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from flask import Flask
+
+from src.api.analysis import Analyzer
+from src.api.models import AnalysisJob
+from src.enums.job_status_enum import JobStatusEnum as JobStatus
+from src.extensions import db
+from src.types.graph_store import GraphStore
+
+JOB_WORKERS = int(os.getenv('ANALYZER_JOB_WORKERS', '2'))
+JOB_QUEUE_SIZE = int(os.getenv('ANALYZER_JOB_QUEUE_SIZE', '16'))
+JOB_STALE_SECONDS = int(os.getenv('ANALYZER_JOB_STALE_SECONDS', '3600'))
+# Must stay below the database's max_allowed_packet
+JOB_MAX_RESULT_BYTES = int(os.getenv('ANALYZER_JOB_MAX_RESULT_BYTES', str(16 * 1024 * 1024)))
+
+JOB_KINDS = ('scoring', 'fund-flow')
+
+class JobQueueFull(Exception):
+    pass
+
+class JobRunner:
+    def __init__(
+        self,
+        app: Flask,
+        analyzer: Analyzer,
+        max_workers: int = JOB_WORKERS,
+        queue_size: int = JOB_QUEUE_SIZE
+    ):
+        self.app = app
+        self.analyzer = analyzer
+        self.executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix='analysis-job')
+        # Running plus queued jobs in this process; beyond this, submissions are refused
+        self._slots = threading.BoundedSemaphore(max(1, max_workers) + max(0, queue_size))
+        self._fail_stale_jobs()
+
+    def submit(self, kind: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        if kind not in JOB_KINDS:
+            raise ValueError(f"kind must be one of {', '.join(JOB_KINDS)}")
+        if not self._slots.acquire(blocking=False):
+            raise JobQueueFull('Too many analysis jobs are queued, retry later')
+
+        try:
+            job = AnalysisJob(
+                id=str(uuid.uuid4()),
+                kind=kind,
+                status=JobStatus.QUEUED,
+                params=params,
+                progress={}
+            )
+            db.session.add(job)
+            db.session.commit()
+            job_data = job.to_dict()
+
+            self.executor.submit(self._run, job.id, kind, params)
+        except BaseException:
+            self._slots.release()
+            raise
+
+        return job_data
+
+    def get(self, job_id: str) -> Optional[AnalysisJob]:
+        return db.session.get(AnalysisJob, job_id)
+
+    def list_jobs(self, status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        query = AnalysisJob.query
+        if status:
+            query = query.filter_by(status=status)
+        jobs = query.order_by(AnalysisJob.created_at.desc()).limit(limit).all()
+        return [job.to_dict() for job in jobs]
+
+    def _run(self, job_id: str, kind: str, params: Dict[str, Any]) -> None:
+        try:
+            with self.app.app_context():
+                self._update(job_id, status=JobStatus.RUNNING, started_at=datetime.utcnow())
+
+                progress = {'hops_completed': 0, 'addresses_fetched': 0, 'nodes': 0, 'edges': 0}
+                try:
+                    graph = self._build_graph(job_id, kind, params, progress)
+                except Exception as e:
+                    self._update(job_id, status=JobStatus.FAILED, error=str(e), finished_at=datetime.utcnow())
+                    return
+
+                progress.update(nodes=len(graph.nodes), edges=graph.edge_count)
+                result = graph.to_dict()
+                result_bytes = len(json.dumps(result))
+                if result_bytes > JOB_MAX_RESULT_BYTES:
+                    self._update(
+                        job_id,
+                        status=JobStatus.FAILED,
+                        progress=dict(progress),
+                        error=(
+                            f"Result is {result_bytes} bytes, over the {JOB_MAX_RESULT_BYTES} byte limit; "
+                            "narrow the job with max_rows, max_calls or a block/time window"
+                        ),
+                        finished_at=datetime.utcnow()
+                    )
+                    return
+
+                self._update(
+                    job_id,
+                    status=JobStatus.SUCCEEDED,
+                    progress=dict(progress),
+                    result=result,
+                    finished_at=datetime.utcnow()
+                )
+        except Exception as e:
+            print(f"Error running analysis job {job_id}: {e}")
+        finally:
+            self._slots.release()
+
+    def _build_graph(self, job_id: str, kind: str, params: Dict[str, Any], progress: Dict[str, Any]) -> GraphStore:
+        def on_hop(graph: GraphStore, hop: int, frontier: List[str]) -> None:
+            progress['hops_completed'] = hop + 1
+            progress['addresses_fetched'] += len(frontier)
+            progress.update(nodes=len(graph.nodes), edges=graph.edge_count)
+            self._update(job_id, progress=dict(progress))
+
+        if kind == 'scoring':
+            return self.analyzer.build_scoring_graph(on_hop=on_hop, **params)
+        return self.analyzer.build_fund_flow_graph(on_hop=on_hop, **params)
+
+    def _fail_stale_jobs(self) -> None:
+        # Jobs only live in the executor of the worker that took them, so a restarted worker orphans its rows.
+        # Other workers may still be running their own jobs, hence the age cutoff instead of failing everything;
+        # keep ANALYZER_JOB_STALE_SECONDS above the longest expected job.
+        cutoff = datetime.utcnow() - timedelta(seconds=JOB_STALE_SECONDS)
+        with self.app.app_context():
+            try:
+                stale = AnalysisJob.query.filter(db.or_(
+                    db.and_(AnalysisJob.status == JobStatus.QUEUED, AnalysisJob.created_at < cutoff),
+                    db.and_(AnalysisJob.status == JobStatus.RUNNING, AnalysisJob.started_at < cutoff)
+                )).all()
+                for job in stale:
+                    job.error = f"Job was still {job.status} after {JOB_STALE_SECONDS}s; presumed lost to a worker restart"
+                    job.status = JobStatus.FAILED
+                    job.finished_at = datetime.utcnow()
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                print(f"Warning: Failed to clean up stale analysis jobs: {e}")
+
+    def _update(self, job_id: str, **fields) -> None:
+        try:
+            job = db.session.get(AnalysisJob, job_id)
+            for name, value in fields.items():
+                setattr(job, name, value)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
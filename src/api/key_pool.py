@@ -0,0 +1,80 @@
+import hashlib
+import os
+import tempfile
+import time
+from typing import Dict, List
+
+from src.utils.rate_limiter import TokenBucket, seconds_until_next_utc_day
+
+ETHERSCAN_RATE_LIMIT = float(os.getenv('ETHERSCAN_RATE_LIMIT', '5'))
+ETHERSCAN_RATE_BURST = int(os.getenv('ETHERSCAN_RATE_BURST', '5'))
+ETHERSCAN_DAILY_LIMIT = int(os.getenv('ETHERSCAN_DAILY_LIMIT', '100000'))
+ETHERSCAN_RATE_LIMIT_DIR = os.getenv('ETHERSCAN_RATE_LIMIT_DIR', tempfile.gettempdir())
+MAX_ACQUIRE_WAIT_SECONDS = 60.0
+
+def parse_api_keys(api_key: str) -> List[str]:
+    return [key.strip() for key in api_key.split(',') if key.strip()]
+
+def _key_digest(api_key: str) -> str:
+    return hashlib.sha256(api_key.encode()).hexdigest()[:16]
+
+class ApiKeyPool:
+    def __init__(
+        self,
+        api_keys: List[str],
+        rate: float = ETHERSCAN_RATE_LIMIT,
+        burst: int = ETHERSCAN_RATE_BURST,
+        daily_limit: int = ETHERSCAN_DAILY_LIMIT,
+        state_dir: str = ETHERSCAN_RATE_LIMIT_DIR
+    ):
+        if not api_keys:
+            raise ValueError('At least one Etherscan API key is required')
+
+        self.api_keys = list(dict.fromkeys(api_keys))
+        self.buckets = {
+            key: TokenBucket(
+                rate=rate,
+                burst=burst,
+                state_path=os.path.join(state_dir, f'etherscan-rate-limit-{_key_digest(key)}.json'),
+                daily_limit=daily_limit
+            )
+            for key in self.api_keys
+        }
+        self._ready_at: Dict[str, float] = {key: 0.0 for key in self.api_keys}
+
+    def __len__(self) -> int:
+        return len(self.api_keys)
+
+    def acquire(self) -> str:
+        while True:
+            waits = []
+
+            for key in self._keys_by_readiness():
+                wait = self.buckets[key].try_acquire()
+                # Remember when this key should next have a token so later calls try it in order
+                self._ready_at[key] = time.time() + wait
+                if wait <= 0:
+                    return key
+                waits.append(wait)
+
+            if min(waits) > MAX_ACQUIRE_WAIT_SECONDS:
+                raise Exception("Etherscan API Error: all API keys are out of their daily quota")
+            time.sleep(min(waits))
+
+    def throttle(self, api_key: str) -> float:
+        delay = self.buckets[api_key].backoff()
+        self._ready_at[api_key] = time.time() + delay
+        return delay
+
+    def exhaust_for_today(self, api_key: str) -> None:
+        now = time.time()
+        self._ready_at[api_key] = now + seconds_until_next_utc_day(now)
+        self.buckets[api_key].block_until(self._ready_at[api_key])
+
+    def mark_success(self, api_key: str) -> None:
+        self.buckets[api_key].reset_backoff()
+
+    def _keys_by_readiness(self) -> List[str]:
+        if len(self.api_keys) == 1:
+            return self.api_keys
+        return sorted(self.api_keys, key=lambda key: self._ready_at[key])
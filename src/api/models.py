@@ -0,0 +1,30 @@
+from datetime import datetime
+
+from ..extensions import db
+
+class AnalysisJob(db.Model):
+    __tablename__ = 'analysis_jobs'
+
+    id = db.Column(db.String(36), primary_key=True)
+    kind = db.Column(db.String(32), nullable=False)
+    status = db.Column(db.String(16), nullable=False, index=True)
+    params = db.Column(db.JSON, default=dict)
+    progress = db.Column(db.JSON, default=dict)
+    result = db.Column(db.JSON)
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'params': self.params,
+            'progress': self.progress or {},
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
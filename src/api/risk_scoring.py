@@ -1,9 +1,11 @@
 import requests
 import json
-from typing import Dict, Any, List, Set
+from typing import Dict, Any, List, Set, Union
 from datetime import datetime
 import os
 
+from src.types.graph_store import GraphStore
+
 RISK_SCORING_API_URL = os.getenv("RISK_SCORING_API_URL", "http://3.38.112.25:5001")
 
 def load_sdn_list() -> Set[str]:
@@ -33,9 +35,15 @@ def load_sdn_list() -> Set[str]:
 SDN_LIST = load_sdn_list()
 print(f"✅ SDN 리스트 로드 완료: {len(SDN_LIST)}개 주소")
 
-def convert_graph_to_transactions(graph_data: Dict[str, Any], target_address: str) -> List[Dict[str, Any]]:
+def convert_graph_to_transactions(
+    graph_data: Union[GraphStore, Dict[str, Any]],
+    target_address: str
+) -> List[Dict[str, Any]]:
     transactions = []
-    edges = graph_data.get('edges', [])
+    if isinstance(graph_data, GraphStore):
+        edges = graph_data.iter_edge_dicts()
+    else:
+        edges = graph_data.get('edges', [])
     
     for edge in edges:
         from_addr = edge.get('from_address', '').lower()
@@ -122,7 +130,7 @@ def call_risk_scoring_api(
 def analyze_address_with_risk_scoring(
     address: str,
     chain_id: int,
-    graph_data: Dict[str, Any],
+    graph_data: Union[GraphStore, Dict[str, Any]],
     analysis_type: str = "basic"
 ) -> Dict[str, Any]:
     transactions = convert_graph_to_transactions(graph_data, address)
@@ -0,0 +1,64 @@
+import json
+import queue
+import threading
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.api.analysis import Analyzer
+from src.types.graph_store import GraphStore
+
+KEEPALIVE_SECONDS = 15
+
+_DONE = object()
+
+def format_event(event: str, data: Any) -> str:
+    return f'event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n'
+
+class _HopDelta:
+    def __init__(self):
+        self.node_count = 0
+        self.edge_count = 0
+
+    def take(self, graph: GraphStore) -> Dict[str, Any]:
+        nodes = [node.to_dict() for node in graph.nodes[self.node_count:]]
+        edges = [graph.edge_dict(index) for index in range(self.edge_count, graph.edge_count)]
+        self.node_count += len(nodes)
+        self.edge_count += len(edges)
+        return {'nodes': nodes, 'edges': edges}
+
+def iter_scoring_events(analyzer: Analyzer, **params) -> Iterator[str]:
+    events: 'queue.Queue' = queue.Queue()
+    delta = _HopDelta()
+
+    def on_hop(graph: GraphStore, hop: int, frontier: List[str]) -> None:
+        events.put(('hop', {'hop': hop, 'frontier': frontier, 'partial': False, **delta.take(graph)}))
+
+    def run() -> None:
+        try:
+            graph = analyzer.build_scoring_graph(on_hop=on_hop, **params)
+            # Edges of a hop cut short by the trace budget never reach on_hop
+            remainder = delta.take(graph)
+            if remainder['nodes'] or remainder['edges']:
+                events.put(('hop', {
+                    'hop': graph.metadata.get('hops_completed'),
+                    'frontier': graph.metadata.get('unexplored', []),
+                    'partial': True,
+                    **remainder
+                }))
+            events.put(('summary', graph.summary()))
+        except Exception as e:
+            events.put(('error', {'error': f'Scoring analysis failed: {str(e)}'}))
+        finally:
+            events.put(_DONE)
+
+    threading.Thread(target=run, name='scoring-events', daemon=True).start()
+
+    while True:
+        try:
+            item: Optional[Any] = events.get(timeout=KEEPALIVE_SECONDS)
+        except queue.Empty:
+            yield ': keepalive\n\n'
+            continue
+
+        if item is _DONE:
+            return
+        yield format_event(*item)
@@ -0,0 +1,288 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from itertools import islice
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+DEFAULT_MAX_WORKERS = int(os.getenv('ANALYZER_MAX_WORKERS', '8'))
+MERGE_BATCH_SIZE = 500
+
+Fetcher = Callable[..., Any]
+Node = Tuple[int, str]
+TaskKey = Tuple[int, str, str]
+RowSink = Callable[[TaskKey, list], None]
+
+class BudgetExhausted(Exception):
+    pass
+
+class TraceBudget:
+    def __init__(self, deadline_ms: Optional[int] = None, max_calls: Optional[int] = None):
+        self.deadline = None if deadline_ms is None else time.monotonic() + deadline_ms / 1000
+        self.max_calls = max_calls
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    @property
+    def exhausted(self) -> bool:
+        if self.max_calls is not None and self.calls >= self.max_calls:
+            return True
+        return self.expired
+
+    @property
+    def expired(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def remaining_seconds(self) -> Optional[float]:
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self.exhausted:
+                return False
+            self.calls += 1
+            return True
+
+    def charge(self) -> None:
+        # One call per upstream HTTP request
+        if not self.try_spend():
+            raise BudgetExhausted('Trace budget exhausted')
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'calls': self.calls,
+            'max_calls': self.max_calls,
+            'exhausted': self.exhausted
+        }
+
+def _batched(rows: Any, size: int = MERGE_BATCH_SIZE):
+    iterator = iter(rows)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+def _group_errors(errors: Dict[TaskKey, str], group: Callable[[TaskKey], Any]) -> Dict[Any, str]:
+    # The first failing action stands for the whole group
+    grouped = {}
+    for key, error in errors.items():
+        grouped.setdefault(group(key), f"{key[2]}: {error}")
+    return grouped
+
+class _OrderedSink:
+    # Merges batches in task order whatever order the fetches run in, so a graph comes out the same
+    # every run. The task at the head streams straight through; later ones wait in memory until it is done.
+    def __init__(self, keys: List[TaskKey], on_rows: RowSink):
+        self.keys = keys
+        self.on_rows = on_rows
+        self.positions = {key: position for position, key in enumerate(keys)}
+        self.pending: List[List[list]] = [[] for _ in keys]
+        self.finished = [False] * len(keys)
+        self.head = 0
+        self.open = True
+        self._lock = threading.Lock()
+
+    def put(self, key: TaskKey, rows: list) -> None:
+        with self._lock:
+            # Fetches abandoned at the deadline must not touch a graph that is already being served
+            if not self.open:
+                return
+            position = self.positions[key]
+            if position == self.head:
+                self.on_rows(key, rows)
+            else:
+                self.pending[position].append(rows)
+
+    def finish(self, key: TaskKey) -> None:
+        with self._lock:
+            self.finished[self.positions[key]] = True
+            while self.open and self.head < len(self.keys) and self.finished[self.head]:
+                self.head += 1
+                self._flush(self.head)
+
+    def close(self) -> None:
+        # Rows already fetched are kept, in task order; anything arriving later is dropped
+        with self._lock:
+            if self.open:
+                for position in range(self.head, len(self.keys)):
+                    self._flush(position)
+                self.open = False
+
+    def _flush(self, position: int) -> None:
+        if position >= len(self.keys):
+            return
+        for rows in self.pending[position]:
+            self.on_rows(self.keys[position], rows)
+        self.pending[position] = []
+
+class TraversalEngine:
+    def __init__(self, fetchers: Dict[str, Fetcher], max_workers: int = DEFAULT_MAX_WORKERS):
+        self.fetchers = fetchers
+        self.max_workers = max(1, max_workers)
+
+    # Rows are handed to on_rows in batches as they arrive, one call at a time, and never
+    # after the fetch call has returned. The result holds the actions that ran to the end, failed
+    # ones included, plus the errors; an action missing from it was skipped or cut off by the budget.
+
+    def fetch_frontier(
+        self,
+        chain_id: int,
+        addresses: List[str],
+        on_rows: Callable[[str, str, list], None],
+        actions: Optional[Sequence[str]] = None,
+        strict: bool = False,
+        address_options: Optional[Dict[str, Dict[str, Any]]] = None,
+        budget: Optional[TraceBudget] = None,
+        **fetch_options
+    ) -> Tuple[Dict[str, Set[str]], Dict[str, str]]:
+        address_options = address_options or {}
+        completed, errors = self.fetch_nodes(
+            nodes=[(chain_id, address) for address in addresses],
+            on_rows=lambda node, action, rows: on_rows(node[1], action, rows),
+            actions=actions,
+            strict=strict,
+            node_options={(chain_id, address): options for address, options in address_options.items()},
+            budget=budget,
+            **fetch_options
+        )
+
+        return (
+            {address: completed[(chain_id, address)] for address in addresses},
+            {node[1]: error for node, error in errors.items()}
+        )
+
+    def fetch_nodes(
+        self,
+        nodes: Sequence[Node],
+        on_rows: Callable[[Node, str, list], None],
+        actions: Optional[Sequence[str]] = None,
+        strict: bool = False,
+        node_options: Optional[Dict[Node, Dict[str, Any]]] = None,
+        budget: Optional[TraceBudget] = None,
+        **fetch_options
+    ) -> Tuple[Dict[Node, Set[str]], Dict[Node, str]]:
+        # Nodes may sit on different chains; all of their fetches share one pool
+        actions = list(actions or self.fetchers)
+        node_options = node_options or {}
+        completed = {node: set() for node in nodes}
+
+        tasks = [
+            (chain_id, address, action, {**fetch_options, **node_options.get((chain_id, address), {})})
+            for chain_id, address in nodes
+            for action in actions
+        ]
+        done, errors = self._run_tasks(
+            tasks,
+            strict=strict,
+            budget=budget,
+            on_rows=lambda key, rows: on_rows((key[0], key[1]), key[2], rows)
+        )
+
+        for chain_id, address, action in done:
+            completed[(chain_id, address)].add(action)
+
+        return completed, _group_errors(errors, lambda key: (key[0], key[1]))
+
+    def fetch_chains(
+        self,
+        chain_ids: Sequence[int],
+        address: str,
+        on_rows: Callable[[int, str, list], None],
+        actions: Optional[Sequence[str]] = None,
+        budget: Optional[TraceBudget] = None,
+        **fetch_options
+    ) -> Tuple[Dict[int, Set[str]], Dict[int, str]]:
+        actions = list(actions or self.fetchers)
+        completed = {chain_id: set() for chain_id in chain_ids}
+
+        tasks = [
+            (chain_id, address, action, fetch_options)
+            for chain_id in chain_ids
+            for action in actions
+        ]
+        done, errors = self._run_tasks(
+            tasks,
+            strict=False,
+            budget=budget,
+            on_rows=lambda key, rows: on_rows(key[0], key[2], rows)
+        )
+
+        for chain_id, _, action in done:
+            completed[chain_id].add(action)
+
+        return completed, _group_errors(errors, lambda key: key[0])
+
+    def _run_tasks(
+        self,
+        tasks: List[Tuple[int, str, str, Dict[str, Any]]],
+        strict: bool,
+        budget: Optional[TraceBudget],
+        on_rows: RowSink
+    ) -> Tuple[Set[TaskKey], Dict[TaskKey, str]]:
+        completed: Set[TaskKey] = set()
+        errors: Dict[TaskKey, str] = {}
+        if not tasks:
+            return completed, errors
+
+        tasks = sorted(tasks, key=lambda task: task[:3])
+        sink = _OrderedSink([task[:3] for task in tasks], on_rows)
+
+        # Tasks skipped or still running when the budget runs out are left out of the result
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(tasks)))
+        futures = []
+        try:
+            for chain_id, address, action, options in tasks:
+                key = (chain_id, address, action)
+                future = executor.submit(self._fetch, key, budget, options, sink)
+                futures.append((key, future))
+
+            timeout = budget.remaining_seconds() if budget is not None else None
+            done, _ = wait([future for _, future in futures], timeout=timeout)
+
+            for key, future in futures:
+                if future not in done:
+                    continue
+
+                try:
+                    if future.result():
+                        completed.add(key)
+                except Exception as e:
+                    if strict:
+                        raise
+                    # A failed fetch is logged and reported, but it is not something a bigger budget would finish
+                    print(f"Error fetching {key[2]} for {key[1]} on chain {key[0]}: {e}")
+                    errors[key] = str(e)
+                    completed.add(key)
+        finally:
+            for _, future in futures:
+                future.cancel()
+            sink.close()
+            # Running fetches stop at their next request once the budget is spent, so they are not waited on
+            executor.shutdown(wait=budget is None or not budget.exhausted)
+
+        return completed, errors
+
+    def _fetch(
+        self,
+        key: TaskKey,
+        budget: Optional[TraceBudget],
+        fetch_options: Dict[str, Any],
+        sink: _OrderedSink
+    ) -> bool:
+        chain_id, address, action = key
+        try:
+            if budget is not None and budget.exhausted:
+                return False
+
+            rows = self.fetchers[action](chain_id=chain_id, address=address, budget=budget, **fetch_options)
+            for batch in _batched(rows):
+                sink.put(key, batch)
+        except BudgetExhausted:
+            return False
+        finally:
+            sink.finish(key)
+
+        return True
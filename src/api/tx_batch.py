@@ -0,0 +1,156 @@
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.enums.tx_types_enum import TxTypesEnum as TxTypes
+from src.types.edge_batch import EdgeBatch
+from src.utils.method_registry import get_method_registry
+from src.utils.token.price_history import NATIVE_TOKEN, PriceHistory, PriceSeries
+from src.utils.token.services import get_token_price
+
+NATIVE_TOKEN_DECIMALS = 18
+NATIVE_TOKEN_SYMBOL = 'ETH'
+# Used when the current price of the native coin cannot be looked up
+NATIVE_FALLBACK_PRICE = 2000.0
+
+def classify_txs(txs: List[dict], action: str) -> List[str]:
+    if action == 'txlistinternal':
+        return [
+            TxTypes.UNKNOWN if tx.get('isError') == '1' or int(tx.get('value') or 0) == 0 else TxTypes.INTERNAL
+            for tx in txs
+        ]
+
+    method_types = get_method_registry().tx_types
+    unknown = TxTypes.UNKNOWN
+    tx_types = [method_types.get(tx['methodId'], unknown) for tx in txs]
+
+    # A token transfer selector only makes an edge out of the token transfer row itself
+    if action != 'tokentx':
+        tx_types = [unknown if tx_type == TxTypes.ERC20_TRANSFER else tx_type for tx_type in tx_types]
+
+    if action == 'txlist':
+        return [
+            TxTypes.NATIVE if tx.get('input') == '0x' else tx_type
+            for tx, tx_type in zip(txs, tx_types)
+        ]
+
+    return tx_types
+
+def edge_log_index(tx: dict, action: str) -> str:
+    if action == 'tokentx':
+        return str(tx.get('logIndex', ''))
+    if action == 'txlistinternal':
+        return f"internal-{tx.get('traceId', '')}"
+    return ''
+
+class _BatchPricer:
+    def __init__(self, chain_id: int, price_history: Optional[PriceHistory]):
+        self.chain_id = chain_id
+        self.price_history = price_history
+        self._series: Dict[str, Optional[PriceSeries]] = {}
+        self._current: Dict[str, Optional[float]] = {}
+
+    def price_getter(self, token: str, symbol: str, default: float) -> Callable[[int], float]:
+        series = self._get_series(token)
+        current = self._get_current(symbol)
+        fallback = default if current is None else current
+
+        if not series:
+            return lambda timestamp: fallback
+
+        max_gap = self.price_history.max_gap
+
+        def price_at(timestamp: int) -> float:
+            price = series.price_at(timestamp, max_gap)
+            return fallback if price is None else price
+
+        return price_at
+
+    def _get_series(self, token: str) -> Optional[PriceSeries]:
+        if token not in self._series:
+            series = None
+            if self.price_history is not None:
+                try:
+                    series = self.price_history.get_series(self.chain_id, token)
+                except Exception as e:
+                    print(f"Warning: Failed to load price history for {token}: {e}")
+            self._series[token] = series
+        return self._series[token]
+
+    def _get_current(self, symbol: str) -> Optional[float]:
+        if symbol not in self._current:
+            price = None
+            try:
+                price_data = get_token_price(symbol)
+                if price_data:
+                    price = price_data["price"]
+            except Exception as e:
+                print(f"Warning: Failed to get {symbol} price: {e}")
+            self._current[symbol] = price
+        return self._current[symbol]
+
+def build_edge_batch(
+    chain_id: int,
+    txs: List[dict],
+    action: str,
+    price_history: Optional[PriceHistory] = None
+) -> Tuple[EdgeBatch, List[float]]:
+    tx_types = classify_txs(txs, action)
+    batch = EdgeBatch(chain_id)
+    row_usd_values = [0.0] * len(txs)
+
+    pricer = _BatchPricer(chain_id, price_history)
+    price_getters: Dict[Tuple[str, str], Callable[[int], float]] = {}
+    scales: Dict[int, int] = {}
+    native_scale = 10 ** NATIVE_TOKEN_DECIMALS
+
+    for row, (tx, tx_type) in enumerate(zip(txs, tx_types)):
+        if tx_type == TxTypes.UNKNOWN:
+            continue
+
+        value = int(tx['value'])
+        timestamp = int(tx['timeStamp'])
+        token_address = ''
+        token_symbol = tx.get('tokenSymbol')
+        usd_value = 0.0
+
+        if tx_type == TxTypes.NATIVE or tx_type == TxTypes.INTERNAL:
+            amount_float = value / native_scale
+            amount = str(amount_float)
+            token_symbol = NATIVE_TOKEN_SYMBOL
+            key = (NATIVE_TOKEN, token_symbol)
+            getter = price_getters.get(key)
+            if getter is None:
+                getter = price_getters[key] = pricer.price_getter(NATIVE_TOKEN, token_symbol, NATIVE_FALLBACK_PRICE)
+            usd_value = amount_float * getter(timestamp)
+        elif tx_type == TxTypes.ERC20_TRANSFER:
+            decimals = int(tx['tokenDecimal'])
+            scale = scales.get(decimals)
+            if scale is None:
+                scale = scales[decimals] = 10 ** decimals
+            amount_float = value / scale
+            amount = str(amount_float)
+            token_address = tx['contractAddress']
+            token_symbol = tx.get('tokenSymbol', 'UNKNOWN')
+            key = (token_address.lower(), token_symbol)
+            getter = price_getters.get(key)
+            if getter is None:
+                getter = price_getters[key] = pricer.price_getter(key[0], token_symbol, 0.0)
+            usd_value = amount_float * getter(timestamp)
+        else:
+            amount = str(value)
+
+        batch.append(
+            tx_hash=tx['hash'],
+            block_height=int(tx['blockNumber']),
+            from_address=tx['from'],
+            to_address=tx['to'],
+            amount=amount,
+            timestamp=timestamp,
+            token_address=token_address,
+            token_symbol=token_symbol,
+            usd_value=usd_value,
+            tx_type=tx_type,
+            log_index=edge_log_index(tx, action)
+        )
+        row_usd_values[row] = usd_value
+
+    return batch, row_usd_values
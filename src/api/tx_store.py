@@ -0,0 +1,122 @@
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+DEFAULT_TX_STORE_PATH = Path(__file__).parent.parent.parent / "data" / "cache" / "etherscan_tx_store.sqlite3"
+TX_STORE_PATH = os.getenv('ETHERSCAN_TX_STORE_PATH', str(DEFAULT_TX_STORE_PATH))
+
+DEFAULT_CHUNK_SIZE = 1000
+
+StoreKey = Tuple[int, str, str]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tx_rows (
+    chain_id INTEGER NOT NULL,
+    address TEXT NOT NULL,
+    action TEXT NOT NULL,
+    row_key TEXT NOT NULL,
+    block_number INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    row TEXT NOT NULL,
+    PRIMARY KEY (chain_id, address, action, row_key)
+);
+CREATE INDEX IF NOT EXISTS idx_tx_rows_block
+    ON tx_rows (chain_id, address, action, block_number, position, row_key);
+CREATE TABLE IF NOT EXISTS sync_state (
+    chain_id INTEGER NOT NULL,
+    address TEXT NOT NULL,
+    action TEXT NOT NULL,
+    first_block INTEGER NOT NULL,
+    last_block INTEGER NOT NULL,
+    PRIMARY KEY (chain_id, address, action)
+);
+"""
+
+def row_key(row: Dict[str, Any]) -> str:
+    return f"{row.get('hash', '')}:{row.get('logIndex', '')}:{row.get('traceId', '')}"
+
+def _row_position(row: Dict[str, Any]) -> int:
+    try:
+        return int(row.get('transactionIndex') or 0) * 1_000_000 + int(row.get('logIndex') or 0)
+    except ValueError:
+        return 0
+
+class TxStore:
+    def __init__(self, path: str = TX_STORE_PATH):
+        self.path = path
+        self._local = threading.local()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        with self._connection() as conn:
+            conn.executescript(_SCHEMA)
+
+    def get_sync_state(self, key: StoreKey) -> Optional[Tuple[int, int]]:
+        cursor = self._connection().execute(
+            'SELECT first_block, last_block FROM sync_state '
+            'WHERE chain_id = ? AND address = ? AND action = ?',
+            key
+        )
+        return cursor.fetchone()
+
+    def save(self, key: StoreKey, rows: Iterable[Dict[str, Any]], first_block: int, last_block: int) -> None:
+        records = [
+            (*key, row_key(row), int(row['blockNumber']), _row_position(row), json.dumps(row))
+            for row in rows
+        ]
+
+        with self._connection() as conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO tx_rows '
+                '(chain_id, address, action, row_key, block_number, position, row) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                records
+            )
+            conn.execute(
+                'INSERT OR REPLACE INTO sync_state '
+                '(chain_id, address, action, first_block, last_block) VALUES (?, ?, ?, ?, ?)',
+                (*key, first_block, last_block)
+            )
+
+    def iter_rows(
+        self,
+        key: StoreKey,
+        startblock: int,
+        endblock: int,
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> Iterator[Dict[str, Any]]:
+        cursor_position = None
+
+        while True:
+            query = (
+                'SELECT block_number, position, row_key, row FROM tx_rows '
+                'WHERE chain_id = ? AND address = ? AND action = ? '
+                'AND block_number BETWEEN ? AND ? '
+            )
+            args = [*key, startblock, endblock]
+
+            if cursor_position is not None:
+                query += 'AND (block_number, position, row_key) < (?, ?, ?) '
+                args.extend(cursor_position)
+
+            query += 'ORDER BY block_number DESC, position DESC, row_key DESC LIMIT ?'
+            args.append(chunk_size)
+
+            chunk = self._connection().execute(query, args).fetchall()
+            for _, _, _, row in chunk:
+                yield json.loads(row)
+
+            if len(chunk) < chunk_size:
+                return
+
+            cursor_position = chunk[-1][:3]
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
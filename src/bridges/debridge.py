@@ -4,6 +4,7 @@ from src.constants.chain_id_mapping import convert_debridge_to_etherscan_chain_i
 
 API_URL = 'https://stats-api.dln.trade/api/Orders/'
 STRING_VALUE = 'stringValue'
+REQUEST_TIMEOUT = 30
 
 def get_order_id_by_tx_hash(tx_hash: str) -> str:
     data = {
@@ -14,7 +15,7 @@ def get_order_id_by_tx_hash(tx_hash: str) -> str:
         'take': 25
     }
 
-    response = requests.post(API_URL + 'filteredList', json=data)
+    response = requests.post(API_URL + 'filteredList', json=data, timeout=REQUEST_TIMEOUT)
     result = response.json()
 
     order = result.get('orders', [])[0]
@@ -25,7 +26,7 @@ def get_order_id_by_tx_hash(tx_hash: str) -> str:
 def decode_bridge_transaction(tx_hash: str) -> Tuple[int, str]:
     order_id = get_order_id_by_tx_hash(tx_hash)
 
-    response = requests.get(API_URL + order_id)
+    response = requests.get(API_URL + order_id, timeout=REQUEST_TIMEOUT)
     result = response.json()
 
     dst_chain_id_debridge = result['takeOfferWithMetadata']['chainId'][STRING_VALUE]
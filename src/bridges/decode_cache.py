@@ -0,0 +1,113 @@
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple
+
+DEFAULT_DECODE_CACHE_PATH = Path(__file__).parent.parent.parent / "data" / "cache" / "bridge_decodes.sqlite3"
+DECODE_CACHE_PATH = os.getenv('BRIDGE_DECODE_CACHE_PATH', str(DEFAULT_DECODE_CACHE_PATH))
+DECODE_CACHE_MEMORY_SIZE = 4096
+
+Decoded = Tuple[Optional[int], str]
+CacheKey = Tuple[int, str]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bridge_decodes (
+    chain_id INTEGER NOT NULL,
+    tx_hash TEXT NOT NULL,
+    decoder TEXT NOT NULL,
+    dst_chain_id INTEGER,
+    recipient TEXT NOT NULL,
+    PRIMARY KEY (chain_id, tx_hash)
+);
+"""
+
+def _cache_key(chain_id: int, tx_hash: str) -> CacheKey:
+    return int(chain_id), tx_hash.lower()
+
+class BridgeDecodeCache:
+    def __init__(self, path: Optional[str] = DECODE_CACHE_PATH, memory_size: int = DECODE_CACHE_MEMORY_SIZE):
+        # An empty path keeps decodes in memory only
+        self.path = path or None
+        self.memory_size = max(1, memory_size)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._memory: 'OrderedDict[CacheKey, Decoded]' = OrderedDict()
+
+        if self.path:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            with self._connection() as conn:
+                conn.executescript(_SCHEMA)
+
+    def get(self, chain_id: int, tx_hash: str) -> Optional[Decoded]:
+        key = _cache_key(chain_id, tx_hash)
+
+        with self._lock:
+            decoded = self._memory.get(key)
+            if decoded is not None:
+                self._memory.move_to_end(key)
+                return decoded
+
+        if not self.path:
+            return None
+
+        row = self._connection().execute(
+            'SELECT dst_chain_id, recipient FROM bridge_decodes WHERE chain_id = ? AND tx_hash = ?',
+            key
+        ).fetchone()
+        if row is None:
+            return None
+
+        decoded = (row[0], row[1])
+        self._remember(key, decoded)
+        return decoded
+
+    def put(self, chain_id: int, tx_hash: str, decoder: str, decoded: Decoded) -> Decoded:
+        key = _cache_key(chain_id, tx_hash)
+        dst_chain_id, recipient = decoded
+        decoded = (None if dst_chain_id is None else int(dst_chain_id), recipient)
+
+        self._remember(key, decoded)
+
+        if self.path:
+            with self._connection() as conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO bridge_decodes '
+                    '(chain_id, tx_hash, decoder, dst_chain_id, recipient) VALUES (?, ?, ?, ?, ?)',
+                    (*key, decoder, *decoded)
+                )
+
+        return decoded
+
+    def _remember(self, key: CacheKey, decoded: Decoded) -> None:
+        with self._lock:
+            self._memory[key] = decoded
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+_decode_cache: Optional[BridgeDecodeCache] = None
+_decode_cache_lock = threading.Lock()
+
+def get_decode_cache() -> BridgeDecodeCache:
+    global _decode_cache
+
+    if _decode_cache is None:
+        with _decode_cache_lock:
+            if _decode_cache is None:
+                try:
+                    _decode_cache = BridgeDecodeCache()
+                except Exception as e:
+                    print(f"Warning: Bridge decode cache is memory-only: {e}")
+                    _decode_cache = BridgeDecodeCache(path=None)
+
+    return _decode_cache
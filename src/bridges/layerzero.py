@@ -0,0 +1,120 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+import requests
+
+METADATA_API_URL = 'https://metadata.layerzero-api.com/v1/metadata/deployments'
+
+DEFAULT_ENDPOINT_INDEX_PATH = Path(__file__).parent.parent.parent / "data" / "cache" / "layerzero_endpoints.json"
+ENDPOINT_INDEX_PATH = os.getenv('LAYERZERO_ENDPOINT_INDEX_PATH', str(DEFAULT_ENDPOINT_INDEX_PATH))
+ENDPOINT_INDEX_TTL = int(os.getenv('LAYERZERO_ENDPOINT_INDEX_TTL', str(86400)))
+ENDPOINT_INDEX_RETRY_SECONDS = 60
+
+class EndpointIndex:
+    def __init__(self, path: str = ENDPOINT_INDEX_PATH, ttl: int = ENDPOINT_INDEX_TTL):
+        self.path = path
+        self.ttl = ttl
+        # LayerZero endpoint id -> chainKey
+        self.chain_keys: Dict[int, str] = {}
+        self.built_at = 0.0
+        # No refresh is attempted before this, so a failing API is not hit on every lookup
+        self.retry_at = 0.0
+        self._lock = threading.Lock()
+
+    def get_chain_key(self, endpoint_id: int) -> Optional[str]:
+        self._ensure_fresh()
+        chain_key = self.chain_keys.get(int(endpoint_id))
+
+        # A new deployment may have been announced since the last build
+        if chain_key is None and self._refresh():
+            chain_key = self.chain_keys.get(int(endpoint_id))
+
+        return chain_key
+
+    def _ensure_fresh(self) -> None:
+        if (self.chain_keys and time.time() - self.built_at < self.ttl) or time.time() < self.retry_at:
+            return
+
+        with self._lock:
+            if not self.chain_keys:
+                self._read()
+            if time.time() - self.built_at >= self.ttl and time.time() >= self.retry_at:
+                self._refresh_locked()
+
+    def _refresh(self) -> bool:
+        with self._lock:
+            # Unknown ids refresh at most once a minute so bad input cannot hammer the API
+            if time.time() - self.built_at < ENDPOINT_INDEX_RETRY_SECONDS or time.time() < self.retry_at:
+                return False
+            return self._refresh_locked()
+
+    def _refresh_locked(self) -> bool:
+        try:
+            response = requests.get(METADATA_API_URL, timeout=30)
+            response.raise_for_status()
+            chain_keys = _build_index(response.json())
+        except Exception as e:
+            # Keep serving whatever index is loaded, even none; retry after a short backoff
+            print(f"Warning: Failed to refresh LayerZero endpoint index: {e}")
+            self.retry_at = time.time() + ENDPOINT_INDEX_RETRY_SECONDS
+            return False
+
+        self.chain_keys = chain_keys
+        self.built_at = time.time()
+        self._write()
+        return True
+
+    def _read(self) -> None:
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        self.chain_keys = {int(eid): chain_key for eid, chain_key in data.get('endpoints', {}).items()}
+        self.built_at = float(data.get('built_at', 0))
+
+    def _write(self) -> None:
+        try:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = f'{self.path}.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump({'built_at': self.built_at, 'endpoints': self.chain_keys}, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Warning: Failed to persist LayerZero endpoint index: {e}")
+
+def _build_index(data: dict) -> Dict[int, str]:
+    chain_keys = {}
+
+    for value in data.values():
+        deployments = value.get('deployments') if isinstance(value, dict) else None
+
+        if deployments is None:
+            continue
+
+        for deployment in deployments:
+            eid = deployment.get('eid')
+            chain_key = deployment.get('chainKey')
+            if eid is None or chain_key is None:
+                continue
+            chain_keys.setdefault(int(eid), chain_key)
+
+    return chain_keys
+
+_endpoint_index: Optional[EndpointIndex] = None
+_endpoint_index_lock = threading.Lock()
+
+def get_endpoint_index() -> EndpointIndex:
+    global _endpoint_index
+
+    if _endpoint_index is None:
+        with _endpoint_index_lock:
+            if _endpoint_index is None:
+                _endpoint_index = EndpointIndex()
+
+    return _endpoint_index
@@ -1,33 +1,15 @@
-import requests
 import eth_abi
-from typing import Tuple
-from web3 import Web3
-from src.constants.rpc_urls import URLS as RPC_URLS
+from typing import Any, Mapping, Optional, Tuple
+from src.bridges.layerzero import get_endpoint_index
 from src.constants.chain_id_mapping import convert_layerzero_to_etherscan_chain_id
-
-METADATA_API_URL = 'https://metadata.layerzero-api.com/v1/metadata/deployments'
+from src.utils.web3_pool import get_web3
 
 def _get_chain_name_by_endpoint_id(endpoint_id: int) -> str:
-    response = requests.get(METADATA_API_URL)
-    data = response.json()
-
-    for value in data.values():
-        deployments = value.get('deployments')
-
-        if deployments is None:
-            continue
-
-        for deployment in deployments:
-            if int(deployment.get('eid')) == endpoint_id:
-                return deployment.get('chainKey')
-
-    return None
-
-def decode_bridge_transaction(tx_hash: str, chain_id: int) -> Tuple[int, str]:
-    url = RPC_URLS[str(chain_id)]
-    w3 = Web3(Web3.HTTPProvider(url))
+    return get_endpoint_index().get_chain_key(endpoint_id)
 
-    tx = w3.eth.get_transaction(transaction_hash=tx_hash)
+def decode_bridge_transaction(tx_hash: str, chain_id: int, tx: Optional[Mapping[str, Any]] = None) -> Tuple[int, str]:
+    if tx is None:
+        tx = get_web3(chain_id).eth.get_transaction(transaction_hash=tx_hash)
 
     input_data = tx['input']
     raw_data = bytes.fromhex(input_data[10:])
@@ -1,6 +0,0 @@
-METHODS: dict[str, dict[str, str]] = {
-    '0xa9059cbb': {
-        'function': 'transfer(address _to, uint256 _value)',
-        'label': 'ERC20_Transfer'
-    }
-}
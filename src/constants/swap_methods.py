@@ -1,18 +0,0 @@
-METHODS: dict[str, dict[str, str]] = {
-    '0x3593564c': {
-        'function': 'execute(bytes commands,bytes[] inputs,uint256 deadline)',
-        'label': 'Uniswap V4 | PancakeSwap | ...'
-    },
-    '0x733214a3': {
-        'function': 'swapTokensSingleV3ERC20ToNative(bytes32 _transactionId,string _integrator,string _referrer,address _receiver,uint256 _minAmountOut,tuple _swapData)',
-        'label': 'LI.FI'
-    },
-    '0xaf7060fd': {
-        'function': 'swapTokensSingleV3NativeToERC20(bytes32 _transactionId,string _integrator,string _referrer,address _receiver,uint256 _minAmountOut,tuple _swapData)',
-        'label': 'LI.FI'
-    },
-    '0x4666fc80': {
-        'function': 'swapTokensSingleV3ERC20ToERC20(bytes32 _transactionId,string _integrator,string _referrer,address _receiver,uint256 _minAmountOut,tuple _swapData)',
-        'label': 'LI.FI'
-    }
-}
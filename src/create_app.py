@@ -2,6 +2,7 @@ import os
 from flask import Flask
 from flask_cors import CORS
 from src.api.analysis import Analyzer
+from src.api.jobs import JobRunner
 from src.extensions import db, migrate
 
 def create_app(api_key: str) -> Flask:
@@ -42,6 +43,7 @@ def _initialize_extensions(app: Flask):
 
 def _register_routes(app: Flask, api_key: str):
     app.analyzer = Analyzer(api_key=api_key)
+    app.job_runner = JobRunner(app=app, analyzer=app.analyzer)
 
     from src.routes import dashboard, live_detection, analysis, reports
     from src.visualizing_data import bp as visualizing_bp
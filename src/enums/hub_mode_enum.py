@@ -0,0 +1,7 @@
+from dataclasses import dataclass
+
+@dataclass(frozen=True)
+class HubModeEnum:
+    EXPAND: str = 'expand'
+    SAMPLE: str = 'sample'
+    LEAF: str = 'leaf'
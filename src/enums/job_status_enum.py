@@ -0,0 +1,8 @@
+from dataclasses import dataclass
+
+@dataclass(frozen=True)
+class JobStatusEnum:
+    QUEUED: str = 'queued'
+    RUNNING: str = 'running'
+    SUCCEEDED: str = 'succeeded'
+    FAILED: str = 'failed'
@@ -1,5 +0,0 @@
-from dataclasses import dataclass
-
-@dataclass(frozen=True)
-class MethodsEnum:
-    ERC20_TRANSFER: str = '0xa9059cbb'
@@ -0,0 +1,7 @@
+from dataclasses import dataclass
+
+@dataclass(frozen=True)
+class RankByEnum:
+    USD: str = 'usd'
+    RECENCY: str = 'recency'
+    COUNT: str = 'count'
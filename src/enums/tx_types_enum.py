@@ -6,4 +6,5 @@ class TxTypesEnum:
     UNKNOWN: str = 'Unknown'
     BRIDGE: str = 'Bridge'
     NATIVE: str = 'Native'
+    INTERNAL: str = 'Internal'
     SWAP: str = 'Swap'
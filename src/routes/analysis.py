@@ -1,31 +1,142 @@
-from flask import Blueprint, jsonify, request, current_app
+from flask import Blueprint, Response, jsonify, request, current_app, stream_with_context
+from src.api.analysis import SUPPORTED_CHAIN_IDS
+from src.api.frontier import RANK_BY_OPTIONS
+from src.api.jobs import JOB_KINDS, JobQueueFull
 from src.api.risk_scoring import analyze_address_with_risk_scoring
+from src.api.trace_events import iter_scoring_events
+from src.enums.job_status_enum import JobStatusEnum as JobStatus
+from src.types.graph_store import GraphStore
 from src.visualizing_data.routes import ingest_core
 
 
 bp = Blueprint('analysis', __name__, url_prefix='/api/analysis')
 
+MAX_BRIDGE_BATCH_SIZE = 200
+
+STREAM_FORMATS = {
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson'
+}
+
+def _stream_format():
+    stream = request.args.get('stream')
+    if stream is not None and stream not in STREAM_FORMATS:
+        return None, (jsonify({'error': 'stream must be "json" or "ndjson"'}), 400)
+    return stream, None
+
+def _graph_response(graph: GraphStore, stream):
+    if stream is None:
+        return jsonify({'data': graph.to_dict()}), 200
+
+    chunks = graph.iter_ndjson() if stream == 'ndjson' else graph.iter_json()
+    return Response(stream_with_context(chunks), mimetype=STREAM_FORMATS[stream])
+
+def _parse_bool(value, default=True):
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).lower() not in ('0', 'false', 'no', 'off')
+
+def _parse_trace_params(kind, data):
+    chain_id = data.get('chain_id')
+    address = data.get('address')
+
+    if not chain_id:
+        return None, (jsonify({'error': 'chain_id is required'}), 400)
+    if not address:
+        return None, (jsonify({'error': 'address is required'}), 400)
+
+    if kind == 'scoring':
+        params = {
+            'chain_id': chain_id,
+            'address': address,
+            'max_hops': data.get('max_hops', data.get('hop_count', 3)),
+            'max_addresses_per_direction': data.get('max_addresses_per_direction', 10),
+            'rank_by': data.get('rank_by', 'usd'),
+            'follow_bridges': _parse_bool(data.get('follow_bridges'))
+        }
+        if params['rank_by'] not in RANK_BY_OPTIONS:
+            return None, (jsonify({'error': f"rank_by must be one of {', '.join(RANK_BY_OPTIONS)}"}), 400)
+        int_names = ['chain_id', 'max_hops', 'max_addresses_per_direction']
+        optional_names = ['deadline_ms', 'max_calls']
+    else:
+        params = {'chain_id': chain_id, 'address': address}
+        int_names = ['chain_id']
+        optional_names = ['max_rows', 'start_block', 'end_block', 'start_time', 'end_time', 'deadline_ms', 'max_calls']
+
+    for name in optional_names:
+        if data.get(name) is not None:
+            params[name] = data[name]
+            int_names.append(name)
+
+    for name in int_names:
+        try:
+            params[name] = int(params[name])
+        except (ValueError, TypeError):
+            return None, (jsonify({'error': f'{name} must be a valid integer'}), 400)
+
+    return params, None
+
 @bp.route('/fund-flow', methods=['GET'])
 def get_fund_flow():
     chain_id = request.args.get('chain_id')
+    chain_ids = request.args.get('chain_ids')
     address = request.args.get('address')
 
-    if not chain_id:
-        return jsonify({'error': 'chain_id is required'}), 400
+    if not chain_id and not chain_ids:
+        return jsonify({'error': 'chain_id or chain_ids is required'}), 400
     if not address:
         return jsonify({'error': 'address is required'}), 400
 
     try:
-        chain_id = int(chain_id)
+        if chain_ids:
+            chain_ids = [] if chain_ids == 'all' else [int(value) for value in chain_ids.split(',') if value.strip()]
+        else:
+            chain_id = int(chain_id)
     except ValueError:
-        return jsonify({'error': 'chain_id must be a valid integer'}), 400
+        return jsonify({'error': 'chain_id and chain_ids must be valid integers'}), 400
+
+    if chain_ids is not None:
+        # An empty list would otherwise mean every supported chain
+        if not chain_ids and request.args.get('chain_ids') != 'all':
+            return jsonify({'error': 'chain_ids must list at least one chain id, or be "all"'}), 400
+        unsupported = [value for value in chain_ids if value not in SUPPORTED_CHAIN_IDS]
+        if unsupported:
+            return jsonify({'error': f"Unsupported chain_ids: {', '.join(map(str, unsupported))}"}), 400
+
+    window = {}
+    for name in ('max_rows', 'start_block', 'end_block', 'start_time', 'end_time', 'deadline_ms', 'max_calls'):
+        value = request.args.get(name)
+        if value is None:
+            continue
+        try:
+            window[name] = int(value)
+        except ValueError:
+            return jsonify({'error': f'{name} must be a valid integer'}), 400
+
+    if chain_ids is not None and ('start_block' in window or 'end_block' in window):
+        return jsonify({'error': 'use start_time/end_time with chain_ids; block numbers differ per chain'}), 400
+
+    stream, error = _stream_format()
+    if error:
+        return error
+
     try:
         analyzer = current_app.analyzer
-        fund_flow = analyzer.get_fund_flow_by_address(
-            chain_id=chain_id,
-            address=address
-        )
-        return jsonify({'data': fund_flow}), 200
+        if chain_ids is not None:
+            graph = analyzer.build_multichain_fund_flow_graph(
+                address=address,
+                chain_ids=chain_ids,
+                **window
+            )
+        else:
+            graph = analyzer.build_fund_flow_graph(
+                chain_id=chain_id,
+                address=address,
+                **window
+            )
+        return _graph_response(graph, stream)
     except Exception as e:
         return jsonify({'error': f'Analysis failed: {str(e)}'}), 500
 
@@ -44,13 +155,45 @@ def get_bridge():
     except (ValueError, TypeError):
         return jsonify({'error': 'chain_id must be a valid integer'}), 400
 
+    stream, error = _stream_format()
+    if error:
+        return error
+
     try:
         analyzer = current_app.analyzer
-        result = analyzer.analyze_bridge_transaction(chain_id=chain_id, tx_hash=tx_hash)
-        return jsonify({'data': result}), 200
+        graph = analyzer.build_bridge_graph(chain_id=chain_id, tx_hash=tx_hash)
+        return _graph_response(graph, stream)
     except Exception as e:
         return jsonify({'error': f'Analyze bridge failed: {str(e)}'}), 500
 
+@bp.route('/bridge/batch', methods=['POST'])
+def get_bridge_batch():
+    data = request.get_json()
+    if not data:
+        return jsonify({'error': 'No JSON data provided'}), 400
+
+    items = data.get('transactions')
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': 'transactions must be a non-empty list of {chain_id, tx_hash}'}), 400
+    if len(items) > MAX_BRIDGE_BATCH_SIZE:
+        return jsonify({'error': f'transactions accepts at most {MAX_BRIDGE_BATCH_SIZE} entries'}), 400
+
+    transactions = []
+    for item in items:
+        if not isinstance(item, dict) or not item.get('chain_id') or not item.get('tx_hash'):
+            return jsonify({'error': 'each transaction requires chain_id and tx_hash'}), 400
+        try:
+            transactions.append((int(item['chain_id']), str(item['tx_hash'])))
+        except (ValueError, TypeError):
+            return jsonify({'error': 'chain_id must be a valid integer'}), 400
+
+    try:
+        analyzer = current_app.analyzer
+        results = analyzer.analyze_bridge_transactions(transactions)
+        return jsonify({'data': results}), 200
+    except Exception as e:
+        return jsonify({'error': f'Analyze bridge batch failed: {str(e)}'}), 500
+
 @bp.route('/scoring', methods=['GET', 'POST'])
 def get_scoring():
     if request.method == 'GET':
@@ -59,6 +202,10 @@ def get_scoring():
         hop_count = request.args.get('hop_count', '3')
         max_hops = hop_count
         max_addresses_per_direction = request.args.get('max_addresses_per_direction', '10')
+        rank_by = request.args.get('rank_by', 'usd')
+        deadline_ms = request.args.get('deadline_ms')
+        max_calls = request.args.get('max_calls')
+        follow_bridges = _parse_bool(request.args.get('follow_bridges'))
     else:
         data = request.get_json()
         if not data:
@@ -68,31 +215,93 @@ def get_scoring():
         address = data.get('address')
         max_hops = data.get('max_hops', data.get('hop_count', 3))
         max_addresses_per_direction = data.get('max_addresses_per_direction', 10)
+        rank_by = data.get('rank_by', 'usd')
+        deadline_ms = data.get('deadline_ms')
+        max_calls = data.get('max_calls')
+        follow_bridges = _parse_bool(data.get('follow_bridges'))
 
     if not chain_id:
         return jsonify({'error': 'chain_id is required'}), 400
     if not address:
         return jsonify({'error': 'address is required'}), 400
+    if rank_by not in RANK_BY_OPTIONS:
+        return jsonify({'error': f"rank_by must be one of {', '.join(RANK_BY_OPTIONS)}"}), 400
 
     try:
         chain_id = int(chain_id)
         max_hops = int(max_hops)
         max_addresses_per_direction = int(max_addresses_per_direction)
+        deadline_ms = int(deadline_ms) if deadline_ms is not None else None
+        max_calls = int(max_calls) if max_calls is not None else None
     except (ValueError, TypeError):
-        return jsonify({'error': 'chain_id, max_hops/hop_count, and max_addresses_per_direction must be valid integers'}), 400
+        return jsonify({'error': 'chain_id, max_hops/hop_count, max_addresses_per_direction, deadline_ms and max_calls must be valid integers'}), 400
+
+    stream, error = _stream_format()
+    if error:
+        return error
 
     try:
         analyzer = current_app.analyzer
-        graph_data = analyzer.get_multihop_fund_flow_for_scoring(
+        graph = analyzer.build_scoring_graph(
             chain_id=chain_id,
             address=address,
             max_hops=max_hops,
-            max_addresses_per_direction=max_addresses_per_direction
+            max_addresses_per_direction=max_addresses_per_direction,
+            rank_by=rank_by,
+            deadline_ms=deadline_ms,
+            max_calls=max_calls,
+            follow_bridges=follow_bridges
         )
-        return jsonify({'data': graph_data}), 200
+        return _graph_response(graph, stream)
     except Exception as e:
         return jsonify({'error': f'Scoring analysis failed: {str(e)}'}), 500
 
+@bp.route('/scoring/events', methods=['GET'])
+def get_scoring_events():
+    params, error = _parse_trace_params('scoring', request.args.to_dict())
+    if error:
+        return error
+
+    events = iter_scoring_events(current_app.analyzer, **params)
+    return Response(
+        stream_with_context(events),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@bp.route('/paths', methods=['GET'])
+def get_paths():
+    chain_id = request.args.get('chain_id')
+    source = request.args.get('source')
+    target = request.args.get('target')
+
+    if not chain_id:
+        return jsonify({'error': 'chain_id is required'}), 400
+    if not source or not target:
+        return jsonify({'error': 'source and target are required'}), 400
+
+    params = {'chain_id': chain_id}
+    for name in ('max_hops', 'max_rows_per_address', 'max_paths', 'deadline_ms', 'max_calls'):
+        if request.args.get(name) is not None:
+            params[name] = request.args.get(name)
+
+    for name, value in params.items():
+        try:
+            params[name] = int(value)
+        except ValueError:
+            return jsonify({'error': f'{name} must be a valid integer'}), 400
+
+    stream, error = _stream_format()
+    if error:
+        return error
+
+    try:
+        analyzer = current_app.analyzer
+        graph = analyzer.build_connecting_path_graph(source=source, target=target, **params)
+        return _graph_response(graph, stream)
+    except Exception as e:
+        return jsonify({'error': f'Path search failed: {str(e)}'}), 500
+
 @bp.route('/risk-scoring', methods=['GET', 'POST'])
 def get_risk_scoring():
     if request.method == 'GET':
@@ -101,6 +310,10 @@ def get_risk_scoring():
         hop_count = request.args.get('hop_count', '3')
         max_hops = hop_count
         max_addresses_per_direction = request.args.get('max_addresses_per_direction', '10')
+        rank_by = request.args.get('rank_by', 'usd')
+        deadline_ms = request.args.get('deadline_ms')
+        max_calls = request.args.get('max_calls')
+        follow_bridges = _parse_bool(request.args.get('follow_bridges'))
         analysis_type = request.args.get('analysis_type', 'basic')
     else:
         data = request.get_json()
@@ -111,6 +324,10 @@ def get_risk_scoring():
         address = data.get('address')
         max_hops = data.get('max_hops', data.get('hop_count', 3))
         max_addresses_per_direction = data.get('max_addresses_per_direction', 10)
+        rank_by = data.get('rank_by', 'usd')
+        deadline_ms = data.get('deadline_ms')
+        max_calls = data.get('max_calls')
+        follow_bridges = _parse_bool(data.get('follow_bridges'))
         analysis_type = data.get('analysis_type', 'basic')
 
     if not chain_id:
@@ -120,22 +337,30 @@ def get_risk_scoring():
 
     if analysis_type not in ['basic', 'advanced']:
         return jsonify({'error': 'analysis_type must be "basic" or "advanced"'}), 400
+    if rank_by not in RANK_BY_OPTIONS:
+        return jsonify({'error': f"rank_by must be one of {', '.join(RANK_BY_OPTIONS)}"}), 400
 
     try:
         chain_id = int(chain_id)
         max_hops = int(max_hops)
         max_addresses_per_direction = int(max_addresses_per_direction)
+        deadline_ms = int(deadline_ms) if deadline_ms is not None else None
+        max_calls = int(max_calls) if max_calls is not None else None
     except (ValueError, TypeError):
-        return jsonify({'error': 'chain_id, max_hops/hop_count, and max_addresses_per_direction must be valid integers'}), 400
+        return jsonify({'error': 'chain_id, max_hops/hop_count, max_addresses_per_direction, deadline_ms and max_calls must be valid integers'}), 400
 
     try:
         analyzer = current_app.analyzer
 
-        graph_data = analyzer.get_multihop_fund_flow_for_scoring(
+        graph_data = analyzer.build_scoring_graph(
             chain_id=chain_id,
             address=address,
             max_hops=max_hops,
-            max_addresses_per_direction=max_addresses_per_direction
+            max_addresses_per_direction=max_addresses_per_direction,
+            rank_by=rank_by,
+            deadline_ms=deadline_ms,
+            max_calls=max_calls,
+            follow_bridges=follow_bridges
         )
 
         result = analyze_address_with_risk_scoring(
@@ -152,3 +377,63 @@ def get_risk_scoring():
         return jsonify({'data': result}), 200
     except Exception as e:
         return jsonify({'error': f'Risk scoring failed: {str(e)}'}), 500
+
+@bp.route('/jobs', methods=['POST'])
+def submit_job():
+    data = request.get_json()
+    if not data:
+        return jsonify({'error': 'No JSON data provided'}), 400
+
+    kind = data.get('type', 'scoring')
+    if kind not in JOB_KINDS:
+        return jsonify({'error': f"type must be one of {', '.join(JOB_KINDS)}"}), 400
+
+    params, error = _parse_trace_params(kind, data)
+    if error:
+        return error
+
+    try:
+        job = current_app.job_runner.submit(kind=kind, params=params)
+        return jsonify({'data': job}), 202
+    except JobQueueFull as e:
+        return jsonify({'error': str(e)}), 503
+    except Exception as e:
+        return jsonify({'error': f'Failed to submit job: {str(e)}'}), 500
+
+@bp.route('/jobs', methods=['GET'])
+def get_jobs():
+    try:
+        status = request.args.get('status')
+        limit = request.args.get('limit', 50, type=int)
+
+        jobs = current_app.job_runner.list_jobs(status=status, limit=limit)
+        return jsonify({'data': jobs}), 200
+    except Exception as e:
+        return jsonify({'error': f'Failed to get jobs: {str(e)}'}), 500
+
+@bp.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id: str):
+    try:
+        job = current_app.job_runner.get(job_id)
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+
+        return jsonify({'data': job.to_dict()}), 200
+    except Exception as e:
+        return jsonify({'error': f'Failed to get job: {str(e)}'}), 500
+
+@bp.route('/jobs/<job_id>/result', methods=['GET'])
+def get_job_result(job_id: str):
+    try:
+        job = current_app.job_runner.get(job_id)
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+
+        if job.status == JobStatus.FAILED:
+            return jsonify({'error': f'Job failed: {job.error}', 'job': job.to_dict()}), 500
+        if job.status != JobStatus.SUCCEEDED:
+            return jsonify({'error': 'Job is not finished yet', 'job': job.to_dict()}), 409
+
+        return jsonify({'data': job.result}), 200
+    except Exception as e:
+        return jsonify({'error': f'Failed to get job result: {str(e)}'}), 500
@@ -1,6 +1,8 @@
 from src.types.node import Node
 from src.types.edge import Edge
 from src.types.graph import Graph
+from src.types.graph_store import GraphStore
+from src.types.scoring_graph import ScoringGraph
 from src.types.risk_info import RiskInfo
 from src.types.bridge_transaction import BridgeTransaction
 from src.types.transaction import Txtype
@@ -9,6 +11,8 @@ __all__ = [
     'Node',
     'Edge',
     'Graph',
+    'GraphStore',
+    'ScoringGraph',
     'RiskInfo',
     'BridgeTransaction',
     'Txtype'
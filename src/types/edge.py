@@ -13,6 +13,7 @@ class Edge:
     TOKEN_SYMBOL: str
     USD_VALUE: str
     TX_TYPE: str
+    LOG_INDEX: str = ''
 
     def to_dict(self):
         return {
@@ -26,5 +27,6 @@ class Edge:
             'token_address': self.TOKEN_ADDRESS,
             'token_symbol': self.TOKEN_SYMBOL,
             'usd_value': self.USD_VALUE,
-            'tx_type': self.TX_TYPE
+            'tx_type': self.TX_TYPE,
+            'log_index': self.LOG_INDEX
         }
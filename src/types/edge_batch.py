@@ -0,0 +1,45 @@
+from typing import Any, List
+
+class EdgeBatch:
+    def __init__(self, chain_id: int):
+        self.chain_id = chain_id
+        self.tx_hashes: List[str] = []
+        self.block_heights: List[int] = []
+        self.from_addresses: List[str] = []
+        self.to_addresses: List[str] = []
+        self.amounts: List[str] = []
+        self.timestamps: List[int] = []
+        self.token_addresses: List[str] = []
+        self.token_symbols: List[str] = []
+        self.usd_values: List[float] = []
+        self.tx_types: List[str] = []
+        self.log_indexes: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.tx_hashes)
+
+    def append(
+        self,
+        tx_hash: str,
+        block_height: int,
+        from_address: str,
+        to_address: str,
+        amount: Any,
+        timestamp: int,
+        token_address: str,
+        token_symbol: str,
+        usd_value: Any,
+        tx_type: str,
+        log_index: str = ''
+    ) -> None:
+        self.tx_hashes.append(tx_hash)
+        self.block_heights.append(block_height)
+        self.from_addresses.append(from_address)
+        self.to_addresses.append(to_address)
+        self.amounts.append(amount)
+        self.timestamps.append(timestamp)
+        self.token_addresses.append(token_address)
+        self.token_symbols.append(token_symbol)
+        self.usd_values.append(usd_value)
+        self.tx_types.append(tx_type)
+        self.log_indexes.append(log_index)
@@ -0,0 +1,347 @@
+import json
+from array import array
+from collections import defaultdict
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+
+from src.types.edge import Edge
+from src.types.edge_batch import EdgeBatch
+
+HASH_BYTES = 32
+STREAM_BATCH_SIZE = 500
+
+def make_node_id(chain_id: int, address: str) -> str:
+    return f'{chain_id}-{address.lower()}'
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False)
+
+def _batched(items: Iterable[Any], size: int = STREAM_BATCH_SIZE) -> Iterator[List[Any]]:
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+def _to_int(value: Any) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+class _StringTable:
+    def __init__(self):
+        self.values: List[str] = []
+        self._ids: Dict[str, int] = {}
+
+    def intern(self, value: Optional[str]) -> int:
+        value = value or ''
+        value_id = self._ids.get(value)
+        if value_id is None:
+            value_id = len(self.values)
+            self._ids[value] = value_id
+            self.values.append(value)
+        return value_id
+
+    def intern_many(self, values: Iterable[Optional[str]]) -> List[int]:
+        ids = self._ids
+        result = []
+        for value in values:
+            value = value or ''
+            value_id = ids.get(value)
+            if value_id is None:
+                value_id = ids[value] = len(self.values)
+                self.values.append(value)
+            result.append(value_id)
+        return result
+
+    def canonical(self, value: str) -> str:
+        return self.values[self.intern(value)]
+
+class EdgeList:
+    def __init__(self, store: 'GraphStore', indexes: Optional[List[int]] = None):
+        self._store = store
+        self._indexes = indexes
+
+    def __len__(self) -> int:
+        return self._store.edge_count if self._indexes is None else len(self._indexes)
+
+    def __getitem__(self, position: int) -> Edge:
+        index = position if self._indexes is None else self._indexes[position]
+        if index < 0:
+            index += self._store.edge_count
+        if not 0 <= index < self._store.edge_count:
+            raise IndexError('edge index out of range')
+        return self._store.edge_at(index)
+
+    def __iter__(self) -> Iterator[Edge]:
+        indexes = range(self._store.edge_count) if self._indexes is None else self._indexes
+        return (self._store.edge_at(index) for index in indexes)
+
+class GraphStore:
+    def __init__(self):
+        self.nodes: list = []
+        self._node_index: Dict[str, int] = {}
+        self._out_edges: Dict[str, array] = defaultdict(lambda: array('q'))
+        self._in_edges: Dict[str, array] = defaultdict(lambda: array('q'))
+        self._edge_keys: Set[bytes] = set()
+        self.metadata: Dict[str, Any] = {}
+
+        # Edge table, one entry per edge in every column
+        self._addresses = _StringTable()
+        self._symbols = _StringTable()
+        self._tx_types = _StringTable()
+        self._log_indexes = _StringTable()
+        self._chain_ids = array('q')
+        self._tx_hashes = bytearray()
+        self._block_heights = array('q')
+        self._timestamps = array('q')
+        self._from_ids = array('i')
+        self._to_ids = array('i')
+        self._token_ids = array('i')
+        self._symbol_ids = array('i')
+        self._tx_type_ids = array('i')
+        self._log_index_ids = array('i')
+        self._amounts = array('d')
+        self._usd_values = array('d')
+        # Values that do not survive the compact encoding, keyed by edge index
+        self._raw_tx_hashes: Dict[int, str] = {}
+        self._raw_amounts: Dict[int, str] = {}
+
+    @property
+    def edges(self) -> EdgeList:
+        return EdgeList(self)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self._block_heights)
+
+    def to_dict(self):
+        return {
+            'nodes': [node.to_dict() for node in self.nodes],
+            'edges': list(self.iter_edge_dicts()),
+            **self.metadata
+        }
+
+    def iter_json(self, envelope: str = 'data') -> Iterator[str]:
+        yield '{%s: {"nodes": [' % _dumps(envelope)
+        yield from self._iter_json_items(node.to_dict() for node in self.nodes)
+        yield '], "edges": ['
+        yield from self._iter_json_items(self.iter_edge_dicts())
+        yield ']'
+        for key, value in self.metadata.items():
+            yield ', %s: %s' % (_dumps(key), _dumps(value))
+        yield '}}'
+
+    def iter_ndjson(self) -> Iterator[str]:
+        for batch in _batched(node.to_dict() for node in self.nodes):
+            yield ''.join(_dumps({'type': 'node', 'data': node}) + '\n' for node in batch)
+        for batch in _batched(self.iter_edge_dicts()):
+            yield ''.join(_dumps({'type': 'edge', 'data': edge}) + '\n' for edge in batch)
+        yield _dumps({'type': 'summary', 'data': self.summary()}) + '\n'
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'node_count': len(self.nodes),
+            'edge_count': self.edge_count,
+            **self.metadata
+        }
+
+    def iter_edge_dicts(self) -> Iterator[Dict[str, Any]]:
+        return (self.edge_dict(index) for index in range(self.edge_count))
+
+    def edge_at(self, index: int) -> Edge:
+        return Edge(
+            CHAIN_ID=self._chain_ids[index],
+            TX_HASH=self._tx_hash(index),
+            BLOCK_HEIGHT=self._block_heights[index],
+            FROM_ADDRESS=self._addresses.values[self._from_ids[index]],
+            TO_ADDRESS=self._addresses.values[self._to_ids[index]],
+            AMOUNT=self._amount(index),
+            TIMESTAMP=self._timestamps[index],
+            TOKEN_ADDRESS=self._addresses.values[self._token_ids[index]],
+            TOKEN_SYMBOL=self._symbols.values[self._symbol_ids[index]],
+            USD_VALUE=self._usd_values[index],
+            TX_TYPE=self._tx_types.values[self._tx_type_ids[index]],
+            LOG_INDEX=self._log_indexes.values[self._log_index_ids[index]]
+        )
+
+    def edge_dict(self, index: int) -> Dict[str, Any]:
+        return {
+            'chain_id': self._chain_ids[index],
+            'tx_hash': self._tx_hash(index),
+            'block_height': self._block_heights[index],
+            'from_address': self._addresses.values[self._from_ids[index]],
+            'to_address': self._addresses.values[self._to_ids[index]],
+            'amount': self._amount(index),
+            'timestamp': self._timestamps[index],
+            'token_address': self._addresses.values[self._token_ids[index]],
+            'token_symbol': self._symbols.values[self._symbol_ids[index]],
+            'usd_value': self._usd_values[index],
+            'tx_type': self._tx_types.values[self._tx_type_ids[index]],
+            'log_index': self._log_indexes.values[self._log_index_ids[index]]
+        }
+
+    def has_node(self, address: str, chain_id: int) -> bool:
+        return make_node_id(chain_id, address) in self._node_index
+
+    def get_node(self, address: str, chain_id: int) -> Optional[Any]:
+        index = self._node_index.get(make_node_id(chain_id, address))
+        return None if index is None else self.nodes[index]
+
+    def out_edges(self, address: str, chain_id: int) -> EdgeList:
+        return EdgeList(self, self._out_edges.get(make_node_id(chain_id, address), []))
+
+    def in_edges(self, address: str, chain_id: int) -> EdgeList:
+        return EdgeList(self, self._in_edges.get(make_node_id(chain_id, address), []))
+
+    def degree(self, address: str, chain_id: int) -> int:
+        node_id = make_node_id(chain_id, address)
+        return len(self._out_edges.get(node_id, [])) + len(self._in_edges.get(node_id, []))
+
+    def add_node(self, address: str, chain_id: int) -> None:
+        if not address:
+            return
+
+        address = self._addresses.canonical(address.lower())
+        node_id = make_node_id(chain_id, address)
+
+        if node_id in self._node_index:
+            return
+
+        self._node_index[node_id] = len(self.nodes)
+        self.nodes.append(self._create_node(node_id=node_id, address=address, chain_id=chain_id))
+
+    def add_edge(
+            self,
+            chain_id: int,
+            tx_hash: str,
+            block_height: int,
+            from_address: str,
+            to_address: str,
+            amount: str,
+            timestamp: int,
+            token_address: str,
+            token_symbol: str,
+            usd_value: str,
+            tx_type: str,
+            log_index: str = ''
+        ) -> bool:
+        batch = EdgeBatch(chain_id)
+        batch.append(
+            tx_hash=tx_hash,
+            block_height=block_height,
+            from_address=from_address,
+            to_address=to_address,
+            amount=amount,
+            timestamp=timestamp,
+            token_address=token_address,
+            token_symbol=token_symbol,
+            usd_value=usd_value,
+            tx_type=tx_type,
+            log_index=log_index
+        )
+        return self.add_edges(batch) == 1
+
+    def add_edges(self, batch: EdgeBatch) -> int:
+        chain_id = batch.chain_id
+        edge_keys = self._edge_keys
+        kept: List[int] = []
+        hashes: List[Optional[bytes]] = []
+        log_indexes: List[str] = []
+
+        for row, (tx_hash, log_index) in enumerate(zip(batch.tx_hashes, batch.log_indexes)):
+            hash_bytes = self._encode_hash(tx_hash)
+            log_index = str(log_index or '')
+            edge_key = b'%d:%s:%s' % (chain_id, hash_bytes or tx_hash.lower().encode(), log_index.encode())
+            if edge_key in edge_keys:
+                continue
+
+            edge_keys.add(edge_key)
+            kept.append(row)
+            hashes.append(hash_bytes)
+            log_indexes.append(log_index)
+
+        if not kept:
+            return 0
+
+        start = self.edge_count
+        from_addresses = [batch.from_addresses[row].lower() for row in kept]
+        to_addresses = [batch.to_addresses[row].lower() for row in kept]
+        token_addresses = [(batch.token_addresses[row] or '').lower() for row in kept]
+
+        out_edges = self._out_edges
+        in_edges = self._in_edges
+        prefix = f'{chain_id}-'
+        for edge_index, from_address, to_address in zip(range(start, start + len(kept)), from_addresses, to_addresses):
+            out_edges[prefix + from_address].append(edge_index)
+            in_edges[prefix + to_address].append(edge_index)
+
+        for offset, (row, hash_bytes) in enumerate(zip(kept, hashes)):
+            if hash_bytes is None:
+                self._raw_tx_hashes[start + offset] = batch.tx_hashes[row]
+                hash_bytes = bytes(HASH_BYTES)
+            self._tx_hashes += hash_bytes
+
+        amounts = [self._encode_amount(start + offset, batch.amounts[row]) for offset, row in enumerate(kept)]
+
+        # The block column goes last: edge_count is read from it
+        self._chain_ids.extend([chain_id] * len(kept))
+        self._timestamps.extend([_to_int(batch.timestamps[row]) for row in kept])
+        self._from_ids.extend(self._addresses.intern_many(from_addresses))
+        self._to_ids.extend(self._addresses.intern_many(to_addresses))
+        self._token_ids.extend(self._addresses.intern_many(token_addresses))
+        self._symbol_ids.extend(self._symbols.intern_many([batch.token_symbols[row] for row in kept]))
+        self._tx_type_ids.extend(self._tx_types.intern_many([batch.tx_types[row] for row in kept]))
+        self._log_index_ids.extend(self._log_indexes.intern_many(log_indexes))
+        self._amounts.extend(amounts)
+        self._usd_values.extend([float(batch.usd_values[row] or 0) for row in kept])
+        self._block_heights.extend([_to_int(batch.block_heights[row]) for row in kept])
+        return len(kept)
+
+    def _create_node(self, node_id: str, address: str, chain_id: int) -> Any:
+        raise NotImplementedError
+
+    @staticmethod
+    def _iter_json_items(items: Iterable[Dict[str, Any]]) -> Iterator[str]:
+        separator = ''
+        for batch in _batched(items):
+            yield separator + ', '.join(_dumps(item) for item in batch)
+            separator = ', '
+
+    def _tx_hash(self, index: int) -> str:
+        raw = self._raw_tx_hashes.get(index)
+        if raw is not None:
+            return raw
+        return '0x' + self._tx_hashes[index * HASH_BYTES:(index + 1) * HASH_BYTES].hex()
+
+    def _amount(self, index: int) -> str:
+        raw = self._raw_amounts.get(index)
+        if raw is not None:
+            return raw
+        return str(self._amounts[index])
+
+    def _encode_amount(self, index: int, amount: Any) -> float:
+        amount = str(amount)
+        try:
+            value = float(amount)
+        except ValueError:
+            self._raw_amounts[index] = amount
+            return 0.0
+
+        if str(value) != amount:
+            self._raw_amounts[index] = amount
+        return value
+
+    @staticmethod
+    def _encode_hash(tx_hash: str) -> Optional[bytes]:
+        if len(tx_hash) != 2 + HASH_BYTES * 2 or not tx_hash.startswith('0x'):
+            return None
+        try:
+            encoded = bytes.fromhex(tx_hash[2:])
+        except ValueError:
+            return None
+        if '0x' + encoded.hex() != tx_hash:
+            return None
+        return encoded
@@ -1,52 +1,38 @@
-import json
 import os
-from typing import Optional
+from typing import Dict, Iterable, Optional
 
-_address_labels: Optional[dict] = None
+from src.utils.watched_config import WatchedJsonConfig
 
-def _load_address_labels() -> dict:
-    global _address_labels
+LABEL_RELOAD_INTERVAL = float(os.getenv('ADDRESS_LABEL_RELOAD_INTERVAL', '5'))
 
-    if _address_labels is not None:
-        return _address_labels
+_config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'configs', 'address_label.json')
 
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    config_path = os.path.join(current_dir, '..', 'configs', 'address_label.json')
+class _LabelIndex:
+    def __init__(self, labels: Dict[str, Dict[str, str]]):
+        # chain id -> lowercase address -> label
+        self.chains: Dict[str, Dict[str, str]] = {
+            str(chain_id): {
+                address.lower(): label
+                for address, label in chain_labels.items()
+            }
+            for chain_id, chain_labels in labels.items()
+        }
 
-    try:
-        with open(config_path, 'r') as f:
-            _address_labels = json.load(f)
-        return _address_labels
-    except FileNotFoundError:
-        print(f"Warning: address_label.json not found at {config_path}")
-        _address_labels = {}
-        return _address_labels
-    except json.JSONDecodeError as e:
-        print(f"Warning: Failed to parse address_label.json: {e}")
-        _address_labels = {}
-        return _address_labels
+_config = WatchedJsonConfig(_config_path, LABEL_RELOAD_INTERVAL, _LabelIndex)
 
-def get_address_label(chain_id: int, address: str) -> Optional[str]:
-    labels = _load_address_labels()
+def _load_index(force: bool = False) -> _LabelIndex:
+    return _config.get(force)
 
-    chain_id_str = str(chain_id)
-    if chain_id_str not in labels:
+def get_address_label(chain_id: int, address: str) -> Optional[str]:
+    chain_labels = _load_index().chains.get(str(chain_id))
+    if not chain_labels:
         return None
 
-    address_lower = address.lower()
-
-    chain_labels = labels[chain_id_str]
-
-    if address_lower in chain_labels:
-        return chain_labels[address_lower]
-
-    for addr_key, label in chain_labels.items():
-        if addr_key.lower() == address_lower:
-            return label
+    return chain_labels.get(address.lower())
 
-    return None
+def get_address_labels(chain_id: int, addresses: Iterable[str]) -> Dict[str, Optional[str]]:
+    chain_labels = _load_index().chains.get(str(chain_id)) or {}
+    return {address: chain_labels.get(address.lower()) for address in addresses}
 
 def reload_address_labels() -> None:
-    global _address_labels
-    _address_labels = None
-    _load_address_labels()
+    _load_index(force=True)
@@ -0,0 +1,65 @@
+import os
+from typing import Dict, Optional
+
+from src.enums.tx_types_enum import TxTypesEnum as TxTypes
+from src.utils.watched_config import WatchedJsonConfig
+
+SIGNATURE_RELOAD_INTERVAL = float(os.getenv('FUNCTION_SIGNATURE_RELOAD_INTERVAL', '5'))
+
+_config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'configs', 'function_signatures.json')
+
+class MethodInfo:
+    __slots__ = ('selector', 'function_name', 'tx_type', 'label', 'protocol', 'decoder')
+
+    def __init__(
+        self,
+        selector: str,
+        function_name: str,
+        tx_type: str,
+        label: str,
+        protocol: Optional[str] = None,
+        decoder: Optional[str] = None
+    ):
+        self.selector = selector
+        self.function_name = function_name
+        self.tx_type = tx_type
+        self.label = label
+        self.protocol = protocol
+        self.decoder = decoder
+
+class MethodRegistry:
+    def __init__(self, signatures: Dict[str, Dict[str, str]]):
+        self.methods: Dict[str, MethodInfo] = {}
+
+        for selector, signature in signatures.items():
+            tx_type = getattr(TxTypes, str(signature.get('type', '')).upper(), None)
+            if tx_type is None:
+                print(f"Warning: Unknown tx type '{signature.get('type')}' for selector {selector}")
+                continue
+
+            selector = selector.lower()
+            self.methods[selector] = MethodInfo(
+                selector=selector,
+                function_name=signature.get('functionName', ''),
+                tx_type=tx_type,
+                label=signature.get('label', ''),
+                protocol=signature.get('protocol'),
+                decoder=signature.get('decoder')
+            )
+
+        # Flat selector -> tx type table for the classification hot loop
+        self.tx_types: Dict[str, str] = {selector: method.tx_type for selector, method in self.methods.items()}
+
+    def get(self, selector: str) -> Optional[MethodInfo]:
+        return self.methods.get(selector[:10].lower())
+
+_config = WatchedJsonConfig(_config_path, SIGNATURE_RELOAD_INTERVAL, MethodRegistry)
+
+def get_method_registry(force: bool = False) -> MethodRegistry:
+    return _config.get(force)
+
+def get_method(selector: str) -> Optional[MethodInfo]:
+    return get_method_registry().get(selector)
+
+def reload_method_registry() -> None:
+    get_method_registry(force=True)
@@ -0,0 +1,141 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+BASE_BACKOFF_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 30.0
+SECONDS_PER_DAY = 86400
+
+def _utc_day(timestamp: float) -> str:
+    return time.strftime('%Y-%m-%d', time.gmtime(timestamp))
+
+def seconds_until_next_utc_day(timestamp: float) -> float:
+    return SECONDS_PER_DAY - (timestamp % SECONDS_PER_DAY)
+
+class TokenBucket:
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        state_path: Optional[str] = None,
+        daily_limit: Optional[int] = None
+    ):
+        if rate <= 0:
+            raise ValueError('rate must be positive')
+
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.daily_limit = daily_limit
+        self.state_path = state_path if fcntl is not None else None
+        self._lock = threading.Lock()
+        self._state = self._initial_state()
+        self._backing_off = False
+
+    def try_acquire(self) -> float:
+        now = time.time()
+
+        with self._locked_state() as state:
+            self._roll_day(state, now)
+
+            if state['blocked_until'] > now:
+                return state['blocked_until'] - now
+            if self.daily_limit is not None and state['day_count'] >= self.daily_limit:
+                return seconds_until_next_utc_day(now)
+
+            tokens = self._refill(state, now)
+            if tokens >= 1:
+                state['tokens'] = tokens - 1
+                state['day_count'] += 1
+                return 0.0
+
+            return (1 - tokens) / self.rate
+
+    def backoff(self) -> float:
+        with self._locked_state() as state:
+            penalty = min(MAX_BACKOFF_SECONDS, max(BASE_BACKOFF_SECONDS, state['backoff'] * 2))
+            state['backoff'] = penalty
+            self._block(state, time.time() + penalty)
+
+        self._backing_off = True
+        return penalty
+
+    def block_until(self, timestamp: float) -> None:
+        with self._locked_state() as state:
+            self._block(state, timestamp)
+
+    def reset_backoff(self) -> None:
+        if not self._backing_off:
+            return
+
+        with self._locked_state() as state:
+            state['backoff'] = 0.0
+
+        self._backing_off = False
+
+    def _refill(self, state: Dict[str, Any], now: float) -> float:
+        elapsed = max(0.0, now - state['updated_at'])
+        state['tokens'] = min(float(self.burst), state['tokens'] + elapsed * self.rate)
+        state['updated_at'] = max(state['updated_at'], now)
+        return state['tokens']
+
+    def _block(self, state: Dict[str, Any], timestamp: float) -> None:
+        state['blocked_until'] = max(state['blocked_until'], timestamp)
+        state['updated_at'] = state['blocked_until']
+        state['tokens'] = 0.0
+
+    def _roll_day(self, state: Dict[str, Any], now: float) -> None:
+        today = _utc_day(now)
+        if state['day'] != today:
+            state['day'] = today
+            state['day_count'] = 0
+
+    def _initial_state(self) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            'tokens': float(self.burst),
+            'updated_at': now,
+            'blocked_until': 0.0,
+            'backoff': 0.0,
+            'day': _utc_day(now),
+            'day_count': 0
+        }
+
+    @contextmanager
+    def _locked_state(self) -> Iterator[Dict[str, Any]]:
+        with self._lock:
+            if self.state_path is None:
+                yield self._state
+                return
+
+            fd = os.open(self.state_path, os.O_RDWR | os.O_CREAT, 0o644)
+            with os.fdopen(fd, 'r+') as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    state = self._read_state(f.read())
+                    yield state
+                    f.seek(0)
+                    f.truncate()
+                    f.write(json.dumps(state))
+                    f.flush()
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _read_state(self, raw: str) -> Dict[str, Any]:
+        state = self._initial_state()
+        if not raw:
+            return state
+
+        try:
+            state.update(json.loads(raw))
+        except ValueError:
+            print(f"Warning: Resetting corrupt rate limiter state at {self.state_path}")
+
+        return state
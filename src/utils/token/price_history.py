@@ -0,0 +1,206 @@
+import csv
+import os
+import sqlite3
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+DEFAULT_PRICE_HISTORY_PATH = Path(__file__).parent.parent.parent.parent / "data" / "cache" / "price_history.sqlite3"
+PRICE_HISTORY_PATH = os.getenv('PRICE_HISTORY_PATH', str(DEFAULT_PRICE_HISTORY_PATH))
+PRICE_HISTORY_CACHE_SIZE = int(os.getenv('PRICE_HISTORY_CACHE_SIZE', '256'))
+PRICE_HISTORY_RELOAD_INTERVAL = float(os.getenv('PRICE_HISTORY_RELOAD_INTERVAL', '5'))
+# A candle older than this does not price a transfer; the caller falls back to the current price
+PRICE_HISTORY_MAX_GAP = int(os.getenv('PRICE_HISTORY_MAX_GAP', str(2 * 86400)))
+
+NATIVE_TOKEN = 'native'
+
+SeriesKey = Tuple[int, str]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS token_prices (
+    chain_id INTEGER NOT NULL,
+    token TEXT NOT NULL,
+    bucket_ts INTEGER NOT NULL,
+    price_usd REAL NOT NULL,
+    PRIMARY KEY (chain_id, token, bucket_ts)
+);
+"""
+
+def _parse_timestamp(value: Any) -> int:
+    text = str(value).strip()
+    try:
+        return int(float(text))
+    except ValueError:
+        parsed = datetime.fromisoformat(text.replace('Z', '+00:00'))
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return int(parsed.timestamp())
+
+def _series_key(chain_id: int, token: Optional[str]) -> SeriesKey:
+    return int(chain_id), (token or NATIVE_TOKEN).lower()
+
+class PriceSeries:
+    __slots__ = ('timestamps', 'prices')
+
+    def __init__(self, rows: Iterable[Tuple[int, float]] = ()):
+        self.timestamps = array('q')
+        self.prices = array('d')
+        for bucket_ts, price in rows:
+            self.timestamps.append(bucket_ts)
+            self.prices.append(price)
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def price_at(self, timestamp: int, max_gap: int = PRICE_HISTORY_MAX_GAP) -> Optional[float]:
+        position = bisect_right(self.timestamps, timestamp) - 1
+        if position < 0 or timestamp - self.timestamps[position] > max_gap:
+            return None
+        return self.prices[position]
+
+class PriceHistory:
+    def __init__(
+        self,
+        path: str = PRICE_HISTORY_PATH,
+        cache_size: int = PRICE_HISTORY_CACHE_SIZE,
+        max_gap: int = PRICE_HISTORY_MAX_GAP,
+        reload_interval: float = PRICE_HISTORY_RELOAD_INTERVAL
+    ):
+        self.path = path
+        self.cache_size = max(1, cache_size)
+        self.max_gap = max_gap
+        self.reload_interval = reload_interval
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._series: 'OrderedDict[SeriesKey, PriceSeries]' = OrderedDict()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        with self._connection() as conn:
+            conn.executescript(_SCHEMA)
+
+        # data_version changes whenever another connection (e.g. the snapshot loader) commits;
+        # one shared watcher connection keeps a single baseline for the whole cache
+        self._watcher = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._data_version = self._watcher.execute('PRAGMA data_version').fetchone()[0]
+        self._checked_at = time.monotonic()
+
+    def price_at(self, chain_id: int, token: Optional[str], timestamp: int) -> Optional[float]:
+        return self.get_series(chain_id, token).price_at(int(timestamp), self.max_gap)
+
+    def get_series(self, chain_id: int, token: Optional[str]) -> PriceSeries:
+        key = _series_key(chain_id, token)
+
+        with self._lock:
+            self._drop_if_changed()
+            series = self._series.get(key)
+            if series is not None:
+                self._series.move_to_end(key)
+                return series
+
+        # Tokens without history are cached as empty series until the table changes
+        series = PriceSeries(self._connection().execute(
+            'SELECT bucket_ts, price_usd FROM token_prices '
+            'WHERE chain_id = ? AND token = ? ORDER BY bucket_ts',
+            key
+        ))
+
+        with self._lock:
+            self._series[key] = series
+            self._series.move_to_end(key)
+            while len(self._series) > self.cache_size:
+                self._series.popitem(last=False)
+
+        return series
+
+    def save(self, rows: Iterable[Tuple[int, str, int, float]]) -> int:
+        records = [
+            (*_series_key(chain_id, token), int(bucket_ts), float(price))
+            for chain_id, token, bucket_ts, price in rows
+        ]
+
+        with self._connection() as conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO token_prices (chain_id, token, bucket_ts, price_usd) VALUES (?, ?, ?, ?)',
+                records
+            )
+
+        with self._lock:
+            for key in {record[:2] for record in records}:
+                self._series.pop(key, None)
+
+        return len(records)
+
+    def _drop_if_changed(self) -> None:
+        # Caller holds self._lock
+        if time.monotonic() - self._checked_at < self.reload_interval:
+            return
+
+        self._checked_at = time.monotonic()
+        data_version = self._watcher.execute('PRAGMA data_version').fetchone()[0]
+        if data_version != self._data_version:
+            self._data_version = data_version
+            self._series.clear()
+
+    def load_csv(self, path: str) -> int:
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            return self.save(self._rows_from_records(csv.DictReader(f)))
+
+    def load_parquet(self, path: str) -> int:
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError('Loading Parquet price snapshots requires pyarrow') from e
+
+        return self.save(self._rows_from_records(pq.read_table(path).to_pylist()))
+
+    def load_file(self, path: str) -> int:
+        if path.endswith('.parquet'):
+            return self.load_parquet(path)
+        return self.load_csv(path)
+
+    @staticmethod
+    def _rows_from_records(records: Iterable[Dict[str, Any]]) -> Iterable[Tuple[int, str, int, float]]:
+        # Columns: chain_id, token_address (empty or "native" for the chain's coin), timestamp, price_usd
+        for record in records:
+            yield (
+                int(record['chain_id']),
+                record.get('token_address') or NATIVE_TOKEN,
+                _parse_timestamp(record['timestamp']),
+                float(record['price_usd'])
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+_price_history: Optional[PriceHistory] = None
+_price_history_loaded = False
+_price_history_lock = threading.Lock()
+
+def get_price_history() -> Optional[PriceHistory]:
+    global _price_history, _price_history_loaded
+
+    with _price_history_lock:
+        if not _price_history_loaded:
+            _price_history_loaded = True
+            if PRICE_HISTORY_PATH:
+                try:
+                    _price_history = PriceHistory()
+                except (OSError, sqlite3.Error) as e:
+                    print(f"Warning: price history unavailable at {PRICE_HISTORY_PATH}: {e}")
+    return _price_history
+
+if __name__ == '__main__':
+    history = PriceHistory()
+    for snapshot in sys.argv[1:]:
+        print(f"Loaded {history.load_file(snapshot)} price buckets from {snapshot}")
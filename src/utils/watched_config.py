@@ -0,0 +1,54 @@
+import json
+import os
+import threading
+import time
+from typing import Callable, Generic, Optional, TypeVar
+
+T = TypeVar('T')
+
+class WatchedJsonConfig(Generic[T]):
+    # Rebuilds a value from a JSON file when its mtime changes, checking at most once per reload_interval
+    def __init__(self, path: str, reload_interval: float, build: Callable[[dict], T]):
+        self.path = path
+        self.reload_interval = reload_interval
+        self.build = build
+        self._value: Optional[T] = None
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, force: bool = False) -> T:
+        value = self._value
+        if not force and value is not None and time.monotonic() - self._checked_at < self.reload_interval:
+            return value
+
+        with self._lock:
+            mtime = self._file_mtime()
+
+            if force or self._value is None or mtime != self._mtime:
+                # Keep serving the previous value if an edit left the file half-written
+                data = self._read()
+                if data or self._value is None:
+                    self._value = self.build(data)
+                    self._mtime = mtime
+
+            self._checked_at = time.monotonic()
+            return self._value
+
+    def _file_mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.path).st_mtime
+        except OSError:
+            return None
+
+    def _read(self) -> dict:
+        name = os.path.basename(self.path)
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            print(f"Warning: {name} not found at {self.path}")
+            return {}
+        except json.JSONDecodeError as e:
+            print(f"Warning: Failed to parse {name}: {e}")
+            return {}
@@ -0,0 +1,112 @@
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from web3 import Web3
+
+from src.constants.rpc_urls import URLS as RPC_URLS
+
+RPC_TIMEOUT = float(os.getenv('RPC_TIMEOUT', '15'))
+RPC_POOL_SIZE = int(os.getenv('RPC_POOL_SIZE', '16'))
+RPC_BATCH_SIZE = int(os.getenv('RPC_BATCH_SIZE', '50'))
+
+class Web3Pool:
+    def __init__(
+        self,
+        urls: Optional[Dict[str, str]] = None,
+        timeout: float = RPC_TIMEOUT,
+        pool_size: int = RPC_POOL_SIZE,
+        batch_size: int = RPC_BATCH_SIZE
+    ):
+        self.urls = urls if urls is not None else RPC_URLS
+        self.timeout = timeout
+        self.pool_size = max(1, pool_size)
+        self.batch_size = max(1, batch_size)
+        self._clients: Dict[str, Web3] = {}
+        self._sessions: Dict[str, requests.Session] = {}
+        self._lock = threading.Lock()
+
+    def get(self, chain_id: int) -> Web3:
+        key = str(chain_id)
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self._build(key)
+                self._clients[key] = client
+            return client
+
+    def get_transactions(self, chain_id: int, tx_hashes: List[str]) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, str]]:
+        # Fetches many transactions with JSON-RPC batch requests; both results are keyed by lowercase hash
+        self.get(chain_id)
+        key = str(chain_id)
+        url = self.urls[key]
+        session = self._sessions[key]
+
+        hashes = list(dict.fromkeys(tx_hash.lower() for tx_hash in tx_hashes))
+        txs: Dict[str, Dict[str, Any]] = {}
+        errors: Dict[str, str] = {}
+
+        for start in range(0, len(hashes), self.batch_size):
+            chunk = hashes[start:start + self.batch_size]
+            payload = [
+                {'jsonrpc': '2.0', 'id': index, 'method': 'eth_getTransactionByHash', 'params': [tx_hash]}
+                for index, tx_hash in enumerate(chunk)
+            ]
+
+            response = session.post(url, json=payload, timeout=self.timeout)
+            response.raise_for_status()
+            replies = response.json()
+            if not isinstance(replies, list):
+                raise Exception(f"RPC for chain {chain_id} rejected the batch request: {replies}")
+
+            # Replies may come back in any order
+            for reply in replies:
+                tx_hash = chunk[reply['id']]
+                if reply.get('error'):
+                    errors[tx_hash] = str(reply['error'].get('message', reply['error']))
+                elif reply.get('result') is None:
+                    errors[tx_hash] = f"Transaction {tx_hash} not found on chain {chain_id}"
+                else:
+                    txs[tx_hash] = reply['result']
+
+            for tx_hash in chunk:
+                if tx_hash not in txs and tx_hash not in errors:
+                    errors[tx_hash] = f"No RPC reply for transaction {tx_hash}"
+
+        return txs, errors
+
+    def _build(self, chain_id: str) -> Web3:
+        url = self.urls.get(chain_id)
+        if url is None:
+            raise ValueError(f"No RPC URL configured for chain {chain_id}")
+
+        # One keep-alive session per chain so repeat calls reuse the TLS connection
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        self._sessions[chain_id] = session
+
+        return Web3(Web3.HTTPProvider(url, request_kwargs={'timeout': self.timeout}, session=session))
+
+_pool: Optional[Web3Pool] = None
+_pool_lock = threading.Lock()
+
+def get_web3_pool() -> Web3Pool:
+    global _pool
+
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = Web3Pool()
+
+    return _pool
+
+def get_web3(chain_id: int) -> Web3:
+    return get_web3_pool().get(chain_id)